@@ -0,0 +1,105 @@
+"""Benchmark del índice geoespacial de eventos frente a un recorrido completo.
+
+Genera N eventos repartidos alrededor de varias ciudades (con densidad realista:
+la mayoría cerca del centro) y mide consultas "cerca de mí" (radio) y de vista de
+mapa (caja) con la rejilla en memoria y con un recorrido completo (lo que costaría
+escanear la base de datos en cada movimiento del mapa).
+
+Uso (desde backend/):
+    poetry run python -m benchmarks.bench_geo_index 100000 1000000
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from src.core.geo import haversine_km
+from src.services.event_service import GeoEvent, GeoGridIndex
+
+CITIES = [(40.4168, -3.7038), (41.3874, 2.1686), (39.4699, -0.3763), (37.3891, -5.9845), (43.2630, -2.9350)]
+NOW = time.time()
+
+
+def generate(n: int, rng: random.Random) -> list[GeoEvent]:
+    events = []
+    for i in range(n):
+        lat, lon = rng.choice(CITIES)
+        start = NOW + rng.uniform(-6, 72) * 3600
+        events.append(GeoEvent(f"e{i}", rng.gauss(lat, 0.08), rng.gauss(lon, 0.1), start, start + 3 * 3600))
+    return events
+
+
+def brute_force_radius(events, lat, lon, radius_km, start, end):
+    matches = [
+        (e, d)
+        for e in events
+        if e.end >= start and e.start <= end and (d := haversine_km(lat, lon, e.lat, e.lon)) <= radius_km
+    ]
+    matches.sort(key=lambda match: match[1])
+    return matches
+
+
+def brute_force_box(events, min_lat, min_lon, max_lat, max_lon, start, end):
+    return [
+        e for e in events
+        if min_lat <= e.lat <= max_lat and min_lon <= e.lon <= max_lon and e.end >= start and e.start <= end
+    ]
+
+
+def measure(fn, queries) -> list[float]:
+    timings = []
+    for query in queries:
+        t0 = time.perf_counter()
+        fn(*query)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"  {name:<22} p50 {statistics.median(ordered):9.3f} ms   p99 {p99:9.3f} ms")
+
+
+def run(n: int, num_queries: int = 200) -> None:
+    rng = random.Random(42)
+    events = generate(n, rng)
+
+    t0 = time.perf_counter()
+    index = GeoGridIndex(cell_km=1.0)
+    for event in events:
+        index.upsert(event)
+    build = time.perf_counter() - t0
+
+    radius_queries = []
+    box_queries = []
+    for _ in range(num_queries):
+        lat, lon = rng.choice(CITIES)
+        lat, lon = rng.gauss(lat, 0.05), rng.gauss(lon, 0.05)
+        window = (NOW, NOW + 24 * 3600)
+        radius_queries.append((lat, lon, rng.choice([1.0, 2.0, 5.0]), *window))
+        box_queries.append((lat - 0.02, lon - 0.03, lat + 0.02, lon + 0.03, *window))
+
+    # Mismo resultado por ambos caminos
+    sample = radius_queries[0]
+    assert [e.id for e, _ in index.radius(*sample)] == [e.id for e, _ in brute_force_radius(events, *sample)]
+
+    brute_queries = max(5, num_queries // (n // 20000 or 1))
+    print(f"\n{n} eventos (construcción de la rejilla: {build:.2f}s, {n / build:,.0f} eventos/s)")
+    report("radio - rejilla", measure(index.radius, radius_queries))
+    report("radio top-50 - rejilla", measure(lambda *q: index.radius(*q, limit=50), radius_queries))
+    report("radio - fuerza bruta", measure(lambda *q: brute_force_radius(events, *q), radius_queries[:brute_queries]))
+    report("caja - rejilla", measure(index.box, box_queries))
+    report("caja - fuerza bruta", measure(lambda *q: brute_force_box(events, *q), box_queries[:brute_queries]))
+
+    t0 = time.perf_counter()
+    for event in events[:10000]:
+        index.upsert(GeoEvent(event.id, event.lat + 0.001, event.lon, event.start, event.end))
+    print(f"  actualización incremental: {10000 / (time.perf_counter() - t0):,.0f} upserts/s")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for size in sizes:
+        run(size)
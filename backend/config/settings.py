@@ -0,0 +1,130 @@
+import os
+
+from dotenv import load_dotenv
+
+# Carga las variables del .env local (en Docker llegan ya como variables de entorno)
+load_dotenv()
+
+# --- Kafka ---
+# Mismas variables que define docker-compose.yaml para el servicio backend_api
+KAFKA_BROKERS = os.getenv("KAFKA_BROKERS", "kafka:9092")
+KAFKA_CLIENT_ID = os.getenv("KAFKA_CLIENT_ID", "backend-api")
+KAFKA_SECURITY_PROTOCOL = os.getenv("KAFKA_SECURITY_PROTOCOL", "PLAINTEXT")
+KAFKA_SASL_MECHANISM = os.getenv("KAFKA_SASL_MECHANISM", "SCRAM-SHA-512")
+KAFKA_USERNAME = os.getenv("KAFKA_USERNAME")
+KAFKA_PASSWORD = os.getenv("KAFKA_PASSWORD")
+
+# Propiedades del productor compartido. Idempotencia igual que en
+# config/kafka_config.yaml, más linger/batch para agrupar los envíos de muchas
+# peticiones HTTP concurrentes en pocos requests al broker.
+KAFKA_PRODUCER_PROPERTIES = {
+    "enable.idempotence": True,
+    "acks": "all",
+    "max.in.flight.requests.per.connection": 5,
+    "linger.ms": int(os.getenv("KAFKA_LINGER_MS", "5")),
+    "batch.size": int(os.getenv("KAFKA_BATCH_SIZE", str(256 * 1024))),
+    "batch.num.messages": 10000,
+    "queue.buffering.max.messages": int(os.getenv("KAFKA_QUEUE_MAX_MESSAGES", "200000")),
+    "queue.buffering.max.kbytes": 256 * 1024,
+    "message.timeout.ms": 30000,
+    # lz4: la compresión más barata en CPU para los mensajes pequeños del backend
+    "compression.type": os.getenv("KAFKA_COMPRESSION_TYPE", "lz4"),
+}
+
+# Codec por defecto de los mensajes del backend: json, msgpack o avro (ver libs/messaging)
+KAFKA_CODEC = os.getenv("KAFKA_CODEC", "msgpack")
+
+
+# Grupo de consumidores del backend (favoritos, invalidación de caché...)
+KAFKA_CONSUMER_GROUP = os.getenv("KAFKA_CONSUMER_GROUP", "backend-api")
+
+
+def get_kafka_client_config() -> dict:
+    """Devuelve la configuración base (brokers + seguridad) común a productor y consumidor."""
+    conf = {
+        "bootstrap.servers": KAFKA_BROKERS,
+        "client.id": KAFKA_CLIENT_ID,
+        "security.protocol": KAFKA_SECURITY_PROTOCOL,
+    }
+    if KAFKA_SECURITY_PROTOCOL in ["SASL_SSL", "SASL_PLAINTEXT"]:
+        conf["sasl.mechanism"] = KAFKA_SASL_MECHANISM
+        conf["sasl.username"] = KAFKA_USERNAME
+        conf["sasl.password"] = KAFKA_PASSWORD
+    return conf
+
+
+def get_kafka_producer_config() -> dict:
+    """Devuelve la configuración del productor compartido del backend."""
+    conf = get_kafka_client_config()
+    conf.update(KAFKA_PRODUCER_PROPERTIES)
+    return conf
+
+
+def get_kafka_consumer_config(group_id: str = KAFKA_CONSUMER_GROUP) -> dict:
+    """Devuelve la configuración de los consumidores del backend (sin auto-commit)."""
+    conf = get_kafka_client_config()
+    conf.update(
+        {
+            "group.id": group_id,
+            "auto.offset.reset": "earliest",
+            "enable.auto.commit": False,
+            # Agrupa fetches para que cada consume(num_messages=N) traiga lotes completos
+            "fetch.min.bytes": 1024,
+            "fetch.wait.max.ms": 100,
+        }
+    )
+    return conf
+
+
+# --- Redis ---
+# Mismo maestro que en docker-compose (redis-master); REDIS_URL tiene prioridad si está definida
+REDIS_HOST = os.getenv("REDIS_HOST", "redis-master")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
+REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+REDIS_URL = os.getenv("REDIS_URL", f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+# Con Sentinel (backup.yaml: redis-sentinel1..3 vigilando "mymaster") el maestro y las
+# réplicas se descubren a través de los sentinels y REDIS_URL no se usa
+REDIS_SENTINELS = [
+    (host, int(port))
+    for host, port in (item.strip().split(":") for item in os.getenv("REDIS_SENTINELS", "").split(",") if item.strip())
+]
+REDIS_MASTER_NAME = os.getenv("REDIS_MASTER_NAME", "mymaster")
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+
+# --- Caché de respuestas (cache-aside sobre Redis + L1 en proceso) ---
+CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", "300"))
+# Fracción aleatoria que se suma al TTL para que las claves de un mismo lote no caduquen a la vez
+CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", "0.1"))
+CACHE_L1_MAX_ITEMS = int(os.getenv("CACHE_L1_MAX_ITEMS", "10000"))
+CACHE_L1_TTL = float(os.getenv("CACHE_L1_TTL", "5"))
+
+
+# --- Eventos ---
+# Topic del que se alimenta el índice geoespacial de eventos activos
+EVENTS_TOPIC = os.getenv("EVENTS_TOPIC", "raw_events")
+# Sorted set GEO compartido entre réplicas
+EVENTS_GEO_KEY = os.getenv("EVENTS_GEO_KEY", "geo:events")
+# Lado de cada celda del índice en memoria (km): ~ el radio típico de una búsqueda "cerca de mí"
+EVENTS_GEO_CELL_KM = float(os.getenv("EVENTS_GEO_CELL_KM", "1.0"))
+# Duración asumida de los eventos que no publican hora de fin
+EVENTS_DEFAULT_DURATION_HOURS = float(os.getenv("EVENTS_DEFAULT_DURATION_HOURS", "3"))
+
+
+# --- Cassandra ---
+# Mismas variables que databases/cassandra/scripts/example.py
+CASSANDRA_CONTACT_POINTS = [cp.strip() for cp in os.getenv("CASSANDRA_CONTACT_POINTS", "").split(",") if cp.strip()]
+CASSANDRA_PORT = int(os.getenv("CASSANDRA_PORT", "9042"))
+CASSANDRA_USERNAME = os.getenv("CASSANDRA_USERNAME")
+CASSANDRA_PASSWORD = os.getenv("CASSANDRA_PASSWORD")
+CASSANDRA_KEYSPACE = os.getenv("CASSANDRA_KEYSPACE", "loop_city_events")
+# Datacenter local para el enrutado DC-aware (CASSANDRA_DC de los nodos)
+CASSANDRA_LOCAL_DC = os.getenv("CASSANDRA_LOCAL_DC", "datacenter1")
+CASSANDRA_CONSISTENCY = os.getenv("CASSANDRA_CONSISTENCY", "LOCAL_QUORUM")
+CASSANDRA_REQUEST_TIMEOUT = float(os.getenv("CASSANDRA_REQUEST_TIMEOUT", "10"))
+# Peticiones en vuelo por execute_concurrent y filas por página en las lecturas
+CASSANDRA_WRITE_CONCURRENCY = int(os.getenv("CASSANDRA_WRITE_CONCURRENCY", "64"))
+CASSANDRA_FETCH_SIZE = int(os.getenv("CASSANDRA_FETCH_SIZE", "1000"))
+# Consumidores del backend que escriben en Cassandra (un único grupo repartido entre réplicas)
+KAFKA_TIMELINE_GROUP = os.getenv("KAFKA_TIMELINE_GROUP", f"{KAFKA_CONSUMER_GROUP}-timeline")
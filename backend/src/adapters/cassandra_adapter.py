@@ -0,0 +1,215 @@
+import threading
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from cassandra import ConsistencyLevel
+from cassandra.auth import PlainTextAuthProvider
+from cassandra.cluster import EXEC_PROFILE_DEFAULT, Cluster, ExecutionProfile, Session
+from cassandra.concurrent import execute_concurrent
+from cassandra.policies import DCAwareRoundRobinPolicy, TokenAwarePolicy
+from cassandra.query import BatchStatement, BatchType, PreparedStatement
+
+from config import settings
+from src.core.logger import logger
+
+
+@dataclass
+class WriteResult:
+    """Resultado de una escritura masiva."""
+
+    rows: int = 0
+    statements: int = 0
+    partitions: int = 0
+    errors: list[Exception] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+
+def build_cluster() -> Cluster:
+    """Crea el ``Cluster`` con enrutado token-aware sobre DC-aware y autenticación por usuario.
+
+    Token-aware envía cada petición directamente a una réplica de su partición
+    (sin salto extra por un coordinador) y DC-aware la mantiene en el datacenter
+    local; ``LOCAL_QUORUM`` por defecto.
+    """
+    profile = ExecutionProfile(
+        load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy(local_dc=settings.CASSANDRA_LOCAL_DC)),
+        consistency_level=ConsistencyLevel.name_to_value[settings.CASSANDRA_CONSISTENCY],
+        request_timeout=settings.CASSANDRA_REQUEST_TIMEOUT,
+    )
+    auth_provider = None
+    if settings.CASSANDRA_USERNAME:
+        auth_provider = PlainTextAuthProvider(username=settings.CASSANDRA_USERNAME, password=settings.CASSANDRA_PASSWORD)
+    return Cluster(
+        settings.CASSANDRA_CONTACT_POINTS,
+        port=settings.CASSANDRA_PORT,
+        auth_provider=auth_provider,
+        execution_profiles={EXEC_PROFILE_DEFAULT: profile},
+        protocol_version=5,
+    )
+
+
+class CassandraAdapter:
+    """Acceso a Cassandra con un único ``Cluster``/``Session`` por proceso.
+
+    - Las sentencias se preparan una vez y se reutilizan (caché por texto CQL).
+    - ``write_many`` agrupa las filas por clave de partición: cada grupo viaja como
+      un batch ``UNLOGGED`` de una sola partición (una mutación en una réplica) y
+      los grupos se ejecutan con ``execute_concurrent`` con concurrencia acotada.
+    - ``stream`` / ``stream_pages`` leen página a página (``fetch_size``), así que
+      un rango de tiempo grande no se carga entero en memoria.
+
+    El driver es síncrono (con sus propios hilos de IO); desde corrutinas se usa
+    con ``asyncio.to_thread``.
+    """
+
+    def __init__(self, session: Session, cluster: Cluster | None = None) -> None:
+        """Inicializa el adaptador.
+
+        Args:
+            session: Sesión conectada (una por proceso, ver ``get_cassandra_adapter``).
+            cluster: Cluster dueño de la sesión, para cerrarlo en ``shutdown``.
+        """
+        self.session = session
+        self.cluster = cluster
+        self._prepared: dict[str, PreparedStatement] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, keyspace: str | None = None) -> "CassandraAdapter":
+        cluster = build_cluster()
+        session = cluster.connect(keyspace or settings.CASSANDRA_KEYSPACE)
+        logger.info(
+            f"Conectado a Cassandra {settings.CASSANDRA_CONTACT_POINTS} (DC local {settings.CASSANDRA_LOCAL_DC}, "
+            f"keyspace {session.keyspace})"
+        )
+        return cls(session, cluster)
+
+    def prepare(self, cql: str) -> PreparedStatement:
+        """Devuelve la sentencia preparada (se prepara en el cluster solo la primera vez)."""
+        statement = self._prepared.get(cql)
+        if statement is None:
+            with self._lock:
+                statement = self._prepared.get(cql)
+                if statement is None:
+                    statement = self._prepared[cql] = self.session.prepare(cql)
+        return statement
+
+    def execute(self, cql: str, params: Sequence[Any] | None = None) -> Any:
+        return self.session.execute(self.prepare(cql), params)
+
+    def _statements(
+        self,
+        prepared: PreparedStatement,
+        rows: Iterable[Sequence[Any]],
+        partition_key: Callable[[Sequence[Any]], Hashable],
+        max_batch_rows: int,
+        result: WriteResult,
+    ) -> Iterator[tuple[Any, Any]]:
+        groups: dict[Hashable, list[Sequence[Any]]] = {}
+        for row in rows:
+            groups.setdefault(partition_key(row), []).append(row)
+            result.rows += 1
+        result.partitions = len(groups)
+        for group in groups.values():
+            if len(group) == 1:
+                result.statements += 1
+                yield prepared, group[0]
+                continue
+            for i in range(0, len(group), max_batch_rows):
+                batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+                for row in group[i : i + max_batch_rows]:
+                    batch.add(prepared, row)
+                result.statements += 1
+                yield batch, None
+
+    def write_many(
+        self,
+        cql: str,
+        rows: Iterable[Sequence[Any]],
+        partition_key: Callable[[Sequence[Any]], Hashable],
+        concurrency: int | None = None,
+        max_batch_rows: int = 50,
+    ) -> WriteResult:
+        """Escribe muchas filas agrupadas por partición con concurrencia acotada.
+
+        Args:
+            cql: INSERT/UPDATE con marcadores ``?``.
+            rows: Parámetros de cada fila, en el orden de los marcadores.
+            partition_key: Extrae la clave de partición de una fila.
+            concurrency: Peticiones en vuelo (por defecto ``CASSANDRA_WRITE_CONCURRENCY``).
+            max_batch_rows: Filas máximas por batch de una partición (evita batches enormes).
+
+        Returns:
+            ``WriteResult`` con las filas, sentencias y errores (no se aborta al primer error).
+        """
+        result = WriteResult()
+        statements = self._statements(self.prepare(cql), rows, partition_key, max_batch_rows, result)
+        outcomes = execute_concurrent(
+            self.session,
+            statements,
+            concurrency=concurrency or settings.CASSANDRA_WRITE_CONCURRENCY,
+            raise_on_first_error=False,
+            results_generator=True,
+        )
+        for success, outcome in outcomes:
+            if not success:
+                result.errors.append(outcome)
+        if result.errors:
+            logger.warning(f"Cassandra: {result.failed}/{result.statements} escrituras fallidas ({result.errors[0]})")
+        return result
+
+    def stream_pages(
+        self,
+        cql: str,
+        params: Sequence[Any] | None = None,
+        fetch_size: int | None = None,
+        paging_state: bytes | None = None,
+    ) -> Iterator[tuple[list[Any], bytes | None]]:
+        """Genera ``(filas de la página, paging_state para continuar)`` hasta agotar el resultado.
+
+        El ``paging_state`` permite reanudar la lectura (p. ej. como cursor de una API).
+        """
+        statement = self.prepare(cql).bind(params or ())
+        statement.fetch_size = fetch_size or settings.CASSANDRA_FETCH_SIZE
+        result = self.session.execute(statement, paging_state=paging_state)
+        while True:
+            yield list(result.current_rows), result.paging_state
+            if not result.has_more_pages:
+                return
+            result.fetch_next_page()
+
+    def stream(self, cql: str, params: Sequence[Any] | None = None, fetch_size: int | None = None) -> Iterator[Any]:
+        """Genera las filas de una consulta página a página (memoria acotada a ``fetch_size`` filas)."""
+        for rows, _ in self.stream_pages(cql, params, fetch_size):
+            yield from rows
+
+    def shutdown(self) -> None:
+        if self.cluster is not None:
+            self.cluster.shutdown()
+
+
+_adapter: CassandraAdapter | None = None
+_adapter_lock = threading.Lock()
+
+
+def get_cassandra_adapter() -> CassandraAdapter:
+    """Adaptador compartido por todo el proceso (se conecta la primera vez que se pide)."""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = CassandraAdapter.connect()
+    return _adapter
+
+
+def close_cassandra_adapter() -> None:
+    global _adapter
+    with _adapter_lock:
+        if _adapter is not None:
+            _adapter.shutdown()
+            _adapter = None
+
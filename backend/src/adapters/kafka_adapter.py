@@ -0,0 +1,359 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from confluent_kafka import Consumer, KafkaError, KafkaException, Message, Producer, TopicPartition
+from loopcity_messaging.serialization import Serializer, deserialize
+
+from config.settings import KAFKA_CODEC
+from src.core.logger import logger
+
+
+def _resolve_future(future: asyncio.Future, result: Any = None, error: BaseException | None = None) -> None:
+    """Completa el future si nadie lo ha cancelado entretanto (se ejecuta en el event loop)."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class AsyncKafkaProducer:
+    """Productor de Kafka compartido por todo el proceso del backend.
+
+    Se crea una sola vez en el lifespan de FastAPI. Un hilo en segundo plano
+    llama a ``poll()`` para servir los delivery reports, de modo que las
+    corrutinas nunca bloquean el event loop esperando al broker: ``produce()``
+    encola el mensaje en el buffer de librdkafka y devuelve un future que se
+    resuelve desde el callback de entrega.
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        poll_timeout: float = 0.1,
+        backpressure_wait: float = 0.05,
+        backpressure_timeout: float = 30.0,
+        producer_factory: Callable[[dict], Producer] = Producer,
+    ) -> None:
+        """Inicializa el productor.
+
+        Args:
+            config: Configuración de librdkafka (ver ``config.settings.get_kafka_producer_config``).
+            poll_timeout: Tiempo máximo (s) que el hilo de poll espera por eventos en cada vuelta.
+            backpressure_wait: Espera (s) entre reintentos cuando la cola local está llena.
+            backpressure_timeout: Tiempo máximo (s) esperando hueco en la cola antes de fallar.
+            producer_factory: Constructor del productor subyacente.
+        """
+        self._producer = producer_factory(config)
+        self._poll_timeout = poll_timeout
+        self._backpressure_wait = backpressure_wait
+        self._backpressure_timeout = backpressure_timeout
+        self._running = False
+        self._poll_thread: threading.Thread | None = None
+        self._serializers: dict[tuple[str, str | None], Serializer] = {}
+
+    def start(self) -> None:
+        """Arranca el hilo que atiende los delivery reports."""
+        if self._running:
+            return
+        self._running = True
+        self._poll_thread = threading.Thread(target=self._poll_loop, name="kafka-producer-poll", daemon=True)
+        self._poll_thread.start()
+
+    def _poll_loop(self) -> None:
+        while self._running:
+            self._producer.poll(self._poll_timeout)
+
+    async def produce(
+        self,
+        topic: str,
+        value: bytes,
+        key: bytes | None = None,
+        headers: list[tuple[str, bytes]] | None = None,
+    ) -> asyncio.Future:
+        """Encola un mensaje y devuelve un future con el resultado de la entrega.
+
+        La llamada solo espera si la cola local de librdkafka está llena
+        (``BufferError``): en ese caso cede el event loop mientras el hilo de
+        poll vacía la cola, en lugar de descartar el mensaje.
+
+        Args:
+            topic: Topic de destino.
+            value: Payload ya serializado.
+            key: Clave de partición.
+            headers: Cabeceras del mensaje.
+
+        Returns:
+            Future que se resuelve con el ``Message`` entregado o falla con ``KafkaException``.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def on_delivery(err: Any, msg: Message) -> None:
+            # Se ejecuta en el hilo de poll: volvemos al event loop de forma segura
+            if err is not None:
+                loop.call_soon_threadsafe(_resolve_future, future, None, KafkaException(err))
+            else:
+                loop.call_soon_threadsafe(_resolve_future, future, msg)
+
+        deadline = time.monotonic() + self._backpressure_timeout
+        while True:
+            try:
+                self._producer.produce(topic, value=value, key=key, headers=headers, on_delivery=on_delivery)
+                return future
+            except BufferError:
+                if time.monotonic() >= deadline:
+                    logger.error(f"Cola del productor llena durante {self._backpressure_timeout}s, mensaje para '{topic}' rechazado")
+                    raise
+                await asyncio.sleep(self._backpressure_wait)
+
+    async def send_and_wait(
+        self,
+        topic: str,
+        value: bytes,
+        key: bytes | None = None,
+        headers: list[tuple[str, bytes]] | None = None,
+    ) -> Message:
+        """Produce un mensaje y espera a que el broker confirme su entrega."""
+        delivery = await self.produce(topic, value, key=key, headers=headers)
+        return await delivery
+
+    async def send(
+        self,
+        topic: str,
+        data: Any,
+        key: str | None = None,
+        codec: str | None = None,
+        schema: str | None = None,
+    ) -> asyncio.Future:
+        """Serializa ``data`` con el codec indicado y lo encola. Devuelve el future de entrega.
+
+        El formato viaja en la cabecera ``content-type`` (y ``schema`` para Avro),
+        así los consumidores lo decodifican con ``decode_message`` sin saberlo de antemano.
+
+        Args:
+            topic: Topic de destino.
+            data: Objeto a serializar.
+            key: Clave de partición.
+            codec: ``json``, ``msgpack`` o ``avro`` (por defecto ``KAFKA_CODEC``).
+            schema: Nombre del esquema Avro registrado (solo con ``codec="avro"``).
+        """
+        serializer_key = (codec or KAFKA_CODEC, schema)
+        serializer = self._serializers.get(serializer_key)
+        if serializer is None:
+            serializer = self._serializers[serializer_key] = Serializer(*serializer_key)
+        value, headers = serializer.serialize(data)
+        return await self.produce(
+            topic,
+            value,
+            key=key.encode("utf-8") if key is not None else None,
+            headers=headers,
+        )
+
+    async def send_json(self, topic: str, data: dict, key: str | None = None) -> asyncio.Future:
+        """Serializa ``data`` como JSON y lo encola. Devuelve el future de entrega."""
+        return await self.send(topic, data, key=key, codec="json")
+
+    def __len__(self) -> int:
+        """Número de mensajes pendientes de entrega en la cola local."""
+        return len(self._producer)
+
+    async def close(self, timeout: float = 30.0) -> None:
+        """Detiene el hilo de poll y vacía la cola pendiente sin bloquear el event loop."""
+        self._running = False
+        if self._poll_thread is not None:
+            await asyncio.to_thread(self._poll_thread.join)
+            self._poll_thread = None
+        remaining = await asyncio.to_thread(self._producer.flush, timeout)
+        if remaining:
+            logger.warning(f"Productor cerrado con {remaining} mensajes sin entregar")
+
+
+def decode_message(msg: Message) -> Any:
+    """Decodifica el payload de un mensaje según su cabecera ``content-type`` (JSON si no la tiene)."""
+    return deserialize(msg.value(), msg.headers())
+
+
+def _commit_offsets(batch: list[Message]) -> list[TopicPartition]:
+    """Calcula el offset a confirmar (último + 1) por cada partición presente en el lote."""
+    last: dict[tuple[str, int], int] = {}
+    for msg in batch:
+        tp = (msg.topic(), msg.partition())
+        if msg.offset() >= last.get(tp, -1):
+            last[tp] = msg.offset()
+    return [TopicPartition(topic, partition, offset + 1) for (topic, partition), offset in last.items()]
+
+
+class AsyncKafkaConsumer:
+    """Puente entre un ``Consumer`` bloqueante y el event loop de FastAPI.
+
+    Un hilo dedicado llama a ``consume(num_messages=N)`` y entrega los lotes al
+    loop a través de una ``asyncio.Queue`` acotada: si los handlers van lentos
+    la cola se llena y el hilo deja de consumir (backpressure), sin bloquear
+    nunca el event loop. Se itera con ``async for batch in consumer``.
+
+    El auto-commit de Kafka está desactivado: los offsets de un lote se
+    confirman cuando el cuerpo del ``async for`` termina con ese lote y se pide
+    el siguiente (o llamando a ``commit(batch)`` explícitamente). Si el handler
+    lanza una excepción el lote no se confirma y se volverá a entregar.
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        topics: list[str],
+        batch_size: int = 500,
+        poll_timeout: float = 1.0,
+        max_queued_batches: int = 4,
+        auto_commit: bool = True,
+        consumer_factory: Callable[[dict], Consumer] = Consumer,
+    ) -> None:
+        """Inicializa el consumidor.
+
+        Args:
+            config: Configuración de librdkafka (debe incluir ``group.id``).
+            topics: Topics a los que suscribirse.
+            batch_size: Máximo de mensajes por llamada a ``consume()``.
+            poll_timeout: Espera máxima (s) de cada ``consume()``.
+            max_queued_batches: Lotes que pueden esperar en la cola antes de frenar al hilo.
+            auto_commit: Confirmar cada lote al pedir el siguiente desde el ``async for``.
+            consumer_factory: Constructor del consumidor subyacente.
+        """
+        conf = dict(config)
+        conf["enable.auto.commit"] = False
+        self._consumer = consumer_factory(conf)
+        self._topics = topics
+        self._batch_size = batch_size
+        self._poll_timeout = poll_timeout
+        self._max_queued_batches = max_queued_batches
+        self._auto_commit = auto_commit
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending_commits: queue.SimpleQueue = queue.SimpleQueue()
+        self._last_batch: list[Message] | None = None
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+    async def start(self) -> None:
+        """Se suscribe a los topics y arranca el hilo de consumo."""
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self._max_queued_batches)
+        self._running = True
+        self._consumer.subscribe(self._topics)
+        self._thread = threading.Thread(target=self._consume_loop, name="kafka-consumer", daemon=True)
+        self._thread.start()
+
+    def _consume_loop(self) -> None:
+        try:
+            while self._running:
+                self._flush_commits()
+                messages = self._consumer.consume(num_messages=self._batch_size, timeout=self._poll_timeout)
+                batch = []
+                for msg in messages:
+                    if msg.error():
+                        if msg.error().code() != KafkaError._PARTITION_EOF:
+                            logger.error(f"Error de consumidor: {msg.error()}")
+                        continue
+                    batch.append(msg)
+                if batch and not self._hand_over(batch):
+                    break
+        except Exception as e:
+            logger.exception(f"Excepción en el hilo del consumidor: {e}")
+        finally:
+            self._flush_commits(asynchronous=False)
+            self._consumer.close()
+            logger.info(f"Consumidor de {self._topics} cerrado")
+
+    def _hand_over(self, batch: list[Message]) -> bool:
+        """Entrega el lote al event loop esperando hueco en la cola. False si se está parando."""
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(batch), self._loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                if not self._running:
+                    future.cancel()
+                    return False
+                self._flush_commits()
+
+    def _flush_commits(self, asynchronous: bool = True) -> None:
+        """Confirma, desde el hilo del consumidor, los offsets que han terminado de procesarse."""
+        offsets: dict[tuple[str, int], TopicPartition] = {}
+        while True:
+            try:
+                for tp in self._pending_commits.get_nowait():
+                    offsets[(tp.topic, tp.partition)] = tp
+            except queue.Empty:
+                break
+        if not offsets:
+            return
+        try:
+            self._consumer.commit(offsets=list(offsets.values()), asynchronous=asynchronous)
+        except KafkaException as e:
+            # Típicamente la partición fue revocada en un rebalanceo: el nuevo dueño la reprocesa
+            logger.warning(f"No se pudieron confirmar offsets: {e}")
+
+    @property
+    def topics(self) -> list[str]:
+        """Topics a los que está suscrito."""
+        return self._topics
+
+    def commit(self, batch: list[Message]) -> None:
+        """Marca un lote como procesado; sus offsets se confirman en el hilo del consumidor."""
+        if batch:
+            self._pending_commits.put(_commit_offsets(batch))
+
+    def __aiter__(self) -> "AsyncKafkaConsumer":
+        return self
+
+    async def __anext__(self) -> list[Message]:
+        if self._auto_commit and self._last_batch is not None:
+            self.commit(self._last_batch)
+        self._last_batch = None
+        if self._queue is None:
+            raise StopAsyncIteration
+        while True:
+            if not self._running and self._queue.empty():
+                raise StopAsyncIteration
+            try:
+                batch = await asyncio.wait_for(self._queue.get(), timeout=self._poll_timeout)
+            except asyncio.TimeoutError:
+                continue
+            self._last_batch = batch
+            return batch
+
+    async def stop(self) -> None:
+        """Detiene el consumo, confirma lo ya procesado y cierra el consumidor."""
+        if not self._running:
+            return
+        self._running = False
+        # Los lotes encolados y no procesados se descartan: sin commit, se reentregarán
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+
+async def run_consumer(consumer: AsyncKafkaConsumer, handler: Callable[[list[Message]], Any]) -> None:
+    """Procesa lotes con ``handler`` (corrutina) hasta que se pare el consumidor.
+
+    Si el handler falla se detiene el consumidor sin confirmar el lote, que
+    se reentregará al siguiente consumidor del grupo.
+    """
+    try:
+        async for batch in consumer:
+            await handler(batch)
+    except Exception as e:
+        logger.exception(f"Error procesando lote de {consumer.topics}, deteniendo consumidor: {e}")
+        await consumer.stop()
+        raise
@@ -0,0 +1,466 @@
+import asyncio
+import random
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from loopcity_messaging.serialization import get_codec
+from redis.asyncio import Redis
+from redis.asyncio.sentinel import Sentinel
+from redis.exceptions import RedisError
+
+from config import settings
+from src.core.geo import haversine_km
+from src.core.logger import logger
+
+_MISSING = object()
+
+
+def create_redis_client(url: str | None = None) -> Redis:
+    """Crea el cliente Redis asíncrono compartido (pool de conexiones propio)."""
+    return Redis.from_url(url or settings.REDIS_URL, max_connections=settings.REDIS_MAX_CONNECTIONS)
+
+
+@dataclass
+class RedisClients:
+    """Cliente del maestro (escrituras) y de las réplicas (lecturas)."""
+
+    master: Redis
+    replica: Redis
+
+    async def aclose(self) -> None:
+        await self.master.aclose()
+        if self.replica is not self.master:
+            await self.replica.aclose()
+
+
+def create_redis_clients() -> RedisClients:
+    """Crea los clientes según la configuración.
+
+    Con ``REDIS_SENTINELS`` el maestro y las réplicas se descubren vía Sentinel
+    (``master_for`` / ``slave_for``), así un failover no requiere reiniciar el
+    backend; las lecturas se reparten entre réplicas y, si no hay ninguna, van al
+    maestro. Sin Sentinel ambos son el mismo cliente de ``REDIS_URL``.
+    """
+    if not settings.REDIS_SENTINELS:
+        client = create_redis_client()
+        return RedisClients(client, client)
+    sentinel = Sentinel(
+        settings.REDIS_SENTINELS,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        password=settings.REDIS_PASSWORD or None,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+    )
+    return RedisClients(
+        sentinel.master_for(settings.REDIS_MASTER_NAME),
+        sentinel.slave_for(settings.REDIS_MASTER_NAME),
+    )
+
+
+def _member(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RedisGeoIndex:
+    """Índice geoespacial de eventos compartido entre réplicas con los comandos ``GEO*``.
+
+    Las posiciones viven en un sorted set GEO (``<key>``); el inicio y el fin de
+    cada evento, en dos sorted sets por timestamp (``<key>:start`` y ``<key>:end``)
+    para filtrar por ventana de tiempo y purgar los eventos terminados.
+    """
+
+    def __init__(self, client: Redis, key: str = "geo:events", reader: Redis | None = None) -> None:
+        """Inicializa el índice.
+
+        Args:
+            client: Cliente Redis asíncrono (maestro: escrituras).
+            key: Clave del sorted set GEO.
+            reader: Cliente para las búsquedas (réplicas); por defecto ``client``.
+        """
+        self.client = client
+        self.reader = reader or client
+        self.key = key
+        self.start_key = f"{key}:start"
+        self.end_key = f"{key}:end"
+
+    async def upsert(self, events: Iterable[tuple[str, float, float, float, float]]) -> None:
+        """Añade o mueve eventos ``(id, lat, lon, inicio, fin)`` en un único round-trip."""
+        pipe = self.client.pipeline(transaction=False)
+        count = 0
+        for event_id, lat, lon, start, end in events:
+            pipe.geoadd(self.key, [lon, lat, event_id])
+            pipe.zadd(self.start_key, {event_id: start})
+            pipe.zadd(self.end_key, {event_id: end})
+            count += 1
+        if count:
+            await pipe.execute()
+
+    async def remove(self, event_ids: list[str]) -> None:
+        if not event_ids:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key in (self.key, self.start_key, self.end_key):
+            pipe.zrem(key, *event_ids)
+        await pipe.execute()
+
+    async def expire(self, now: float) -> int:
+        """Elimina los eventos que terminaron antes de ``now``. Devuelve cuántos."""
+        ended = [_member(m) for m in await self.client.zrangebyscore(self.end_key, "-inf", f"({now}")]
+        await self.remove(ended)
+        return len(ended)
+
+    async def search_radius(
+        self, lat: float, lon: float, radius_km: float, count: int | None = None
+    ) -> list[tuple[str, float, float, float]]:
+        """Eventos a menos de ``radius_km`` ordenados por distancia: ``(id, distancia_km, lat, lon)``."""
+        results = await self.reader.geosearch(
+            self.key,
+            longitude=lon,
+            latitude=lat,
+            radius=radius_km,
+            unit="km",
+            withdist=True,
+            withcoord=True,
+            sort="ASC",
+            count=count,
+        )
+        return [(_member(member), dist, coord[1], coord[0]) for member, dist, coord in results]
+
+    async def search_box(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float
+    ) -> list[tuple[str, float, float]]:
+        """Eventos dentro del rectángulo ``(id, lat, lon)``.
+
+        Se busca por el círculo que circunscribe la caja y se recorta en cliente:
+        mismo coste que ``BYBOX`` en Redis y el resultado es exacto en grados.
+        """
+        center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        radius = haversine_km(center_lat, center_lon, max_lat, max_lon)
+        radius = max(radius, haversine_km(center_lat, center_lon, min_lat, max_lon))
+        results = await self.reader.geosearch(
+            self.key, longitude=center_lon, latitude=center_lat, radius=radius * 1.001, unit="km", withcoord=True
+        )
+        return [
+            (_member(member), coord[1], coord[0])
+            for member, coord in results
+            if min_lat <= coord[1] <= max_lat and min_lon <= coord[0] <= max_lon
+        ]
+
+    async def time_bounds(self, event_ids: list[str]) -> list[tuple[float | None, float | None]]:
+        """``(inicio, fin)`` de cada evento, en el mismo orden."""
+        if not event_ids:
+            return []
+        pipe = self.reader.pipeline(transaction=False)
+        pipe.zmscore(self.start_key, event_ids)
+        pipe.zmscore(self.end_key, event_ids)
+        starts, ends = await pipe.execute()
+        return list(zip(starts, ends, strict=True))
+
+    async def scan_active(self, now: float, batch_size: int = 5000) -> AsyncIterator[list[tuple[str, float, float, float, float]]]:
+        """Recorre por lotes los eventos no terminados: ``(id, lat, lon, inicio, fin)``."""
+        offset = 0
+        while True:
+            page = await self.reader.zrangebyscore(
+                self.end_key, now, "+inf", start=offset, num=batch_size, withscores=True
+            )
+            if not page:
+                return
+            offset += len(page)
+            ids = [_member(member) for member, _ in page]
+            pipe = self.reader.pipeline(transaction=False)
+            pipe.geopos(self.key, *ids)
+            pipe.zmscore(self.start_key, ids)
+            positions, starts = await pipe.execute()
+            yield [
+                (event_id, pos[1], pos[0], start, end)
+                for event_id, (_, end), pos, start in zip(ids, page, positions, starts, strict=True)
+                if pos is not None and start is not None
+            ]
+
+
+
+class L1Cache:
+    """Caché LRU en proceso con TTL corto delante de Redis (sin round-trip para las claves más calientes)."""
+
+    def __init__(self, max_items: int = 10000, ttl: float = 5.0) -> None:
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> Any:
+        """Devuelve el valor o ``_MISSING`` si no está o ha caducado."""
+        item = self._items.get(key)
+        if item is None:
+            return _MISSING
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._items[key]
+            return _MISSING
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        # Nunca más que el TTL de Redis: L1 no debe servir algo que Redis ya ha descartado
+        self._items[key] = (time.monotonic() + min(self.ttl, ttl if ttl is not None else self.ttl), value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class RedisCache:
+    """Caché cache-aside de respuestas (listados de eventos, recomendaciones) sobre Redis.
+
+    - Lecturas en las réplicas y escrituras en el maestro (ver ``create_redis_clients``).
+    - TTL con jitter para que las claves escritas juntas no caduquen juntas.
+    - ``get_or_load`` agrupa las peticiones concurrentes de una misma clave
+      (single-flight) en el proceso y, entre réplicas, con un lock ``SET NX PX``:
+      cuando una clave caliente caduca solo se lanza una consulta al backend.
+    - ``get_many`` resuelve un listado con un único ``MGET``.
+    - Un L1 en proceso con TTL corto evita el round-trip para las claves más pedidas.
+
+    La caché es best-effort: si Redis falla se consulta directamente al backend.
+    """
+
+    def __init__(
+        self,
+        master: Redis,
+        replica: Redis | None = None,
+        namespace: str = "cache",
+        default_ttl: int = 300,
+        jitter: float = 0.1,
+        l1: L1Cache | None = None,
+        codec: str = "msgpack",
+        lock_ttl: float = 10.0,
+        lock_wait: float = 2.0,
+    ) -> None:
+        """Inicializa la caché.
+
+        Args:
+            master: Cliente del maestro (escrituras y locks).
+            replica: Cliente de las réplicas (lecturas); por defecto ``master``.
+            namespace: Prefijo de las claves.
+            default_ttl: TTL por defecto (s).
+            jitter: Fracción máxima aleatoria que se suma al TTL.
+            l1: Caché en proceso opcional.
+            codec: Codec de los valores (``msgpack`` o ``json``, ver ``loopcity_messaging``).
+            lock_ttl: Vigencia (s) del lock de carga entre réplicas.
+            lock_wait: Cuánto (s) espera una réplica a que otra cargue la clave antes de cargarla ella.
+        """
+        self.master = master
+        self.replica = replica or master
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.jitter = jitter
+        self.l1 = l1
+        self.codec = get_codec(codec)
+        self.lock_ttl = lock_ttl
+        self.lock_wait = lock_wait
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.stats = {"l1_hits": 0, "hits": 0, "misses": 0, "loads": 0, "coalesced": 0, "errors": 0}
+
+    @classmethod
+    def from_settings(cls, clients: RedisClients, namespace: str = "cache") -> "RedisCache":
+        """Caché con la configuración ``CACHE_*`` de ``config.settings``."""
+        return cls(
+            clients.master,
+            clients.replica,
+            namespace=namespace,
+            default_ttl=settings.CACHE_DEFAULT_TTL,
+            jitter=settings.CACHE_TTL_JITTER,
+            l1=L1Cache(settings.CACHE_L1_MAX_ITEMS, settings.CACHE_L1_TTL) if settings.CACHE_L1_MAX_ITEMS else None,
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def ttl_with_jitter(self, ttl: int | None = None) -> int:
+        ttl = ttl or self.default_ttl
+        return max(1, int(ttl + random.uniform(0, ttl * self.jitter)))
+
+    async def _read(self, command: str, *args: Any) -> Any:
+        """Lee de las réplicas; si fallan (réplica caída o en resincronización), del maestro."""
+        try:
+            return await getattr(self.replica, command)(*args)
+        except RedisError:
+            if self.replica is self.master:
+                raise
+            return await getattr(self.master, command)(*args)
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """Devuelve el valor cacheado o ``default``."""
+        value = await self._get(key)
+        return default if value is _MISSING else value
+
+    async def _get(self, key: str) -> Any:
+        if self.l1 is not None:
+            value = self.l1.get(key)
+            if value is not _MISSING:
+                self.stats["l1_hits"] += 1
+                return value
+        try:
+            raw = await self._read("get", self._key(key))
+        except RedisError as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Caché no disponible leyendo '{key}': {e}")
+            return _MISSING
+        if raw is None:
+            self.stats["misses"] += 1
+            return _MISSING
+        self.stats["hits"] += 1
+        value = self.codec.decode(raw)
+        if self.l1 is not None:
+            self.l1.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int | None = None) -> None:
+        """Guarda el valor en el maestro con TTL + jitter (y en el L1)."""
+        ttl = self.ttl_with_jitter(ttl)
+        if self.l1 is not None:
+            self.l1.set(key, value, ttl)
+        try:
+            await self.master.set(self._key(key), self.codec.encode(value), ex=ttl)
+        except RedisError as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Caché no disponible escribiendo '{key}': {e}")
+
+    async def delete(self, *keys: str) -> None:
+        """Invalida claves (en Redis y en el L1 de esta réplica)."""
+        if not keys:
+            return
+        if self.l1 is not None:
+            for key in keys:
+                self.l1.delete(key)
+        try:
+            await self.master.delete(*(self._key(key) for key in keys))
+        except RedisError as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Caché no disponible invalidando {len(keys)} claves: {e}")
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, Any]:
+        """Devuelve las claves cacheadas (las que faltan no aparecen) con un único ``MGET``."""
+        found: dict[str, Any] = {}
+        pending = []
+        for key in keys:
+            value = self.l1.get(key) if self.l1 is not None else _MISSING
+            if value is _MISSING:
+                pending.append(key)
+            else:
+                self.stats["l1_hits"] += 1
+                found[key] = value
+        if not pending:
+            return found
+        try:
+            raws = await self._read("mget", [self._key(key) for key in pending])
+        except RedisError as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Caché no disponible leyendo {len(pending)} claves: {e}")
+            return found
+        for key, raw in zip(pending, raws, strict=True):
+            if raw is None:
+                self.stats["misses"] += 1
+                continue
+            self.stats["hits"] += 1
+            found[key] = value = self.codec.decode(raw)
+            if self.l1 is not None:
+                self.l1.set(key, value)
+        return found
+
+    async def set_many(self, values: dict[str, Any], ttl: int | None = None) -> None:
+        """Guarda varias claves en un pipeline (cada una con su propio jitter)."""
+        if not values:
+            return
+        pipe = self.master.pipeline(transaction=False)
+        for key, value in values.items():
+            key_ttl = self.ttl_with_jitter(ttl)
+            if self.l1 is not None:
+                self.l1.set(key, value, key_ttl)
+            pipe.set(self._key(key), self.codec.encode(value), ex=key_ttl)
+        try:
+            await pipe.execute()
+        except RedisError as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Caché no disponible escribiendo {len(values)} claves: {e}")
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int | None = None) -> Any:
+        """Devuelve el valor cacheado o lo carga con ``loader`` una sola vez aunque lo pidan N a la vez."""
+        value = await self._get(key)
+        if value is not _MISSING:
+            return value
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            # La carga corre en su propia tarea: si el cliente que la inició se desconecta
+            # (cancelación) los demás que esperan la misma clave siguen recibiendo el valor
+            task = asyncio.ensure_future(self._load_once(key, loader, ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._load_done(key, done))
+        return await asyncio.shield(task)
+
+    def _load_done(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # marcada como recuperada aunque todos los que esperaban se hayan ido
+
+    async def _load_once(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int | None) -> Any:
+        """Carga la clave coordinándose con las demás réplicas mediante un lock en Redis."""
+        lock_key, token = self._key(f"{key}:lock"), secrets.token_hex(8)
+        try:
+            acquired = await self.master.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except RedisError:
+            acquired = True  # sin Redis no hay nada que coordinar
+        if not acquired:
+            # Otra réplica está cargando la clave: esperamos a que la publique (leyendo del maestro)
+            deadline = time.monotonic() + self.lock_wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                try:
+                    raw = await self.master.get(self._key(key))
+                except RedisError:
+                    break
+                if raw is not None:
+                    self.stats["coalesced"] += 1
+                    value = self.codec.decode(raw)
+                    if self.l1 is not None:
+                        self.l1.set(key, value)
+                    return value
+        self.stats["loads"] += 1
+        try:
+            value = await loader()
+            await self.set(key, value, ttl)
+            return value
+        finally:
+            if acquired:
+                try:
+                    if await self.master.get(lock_key) == token.encode():
+                        await self.master.delete(lock_key)
+                except RedisError:
+                    pass
+
+    async def get_many_or_load(
+        self,
+        keys: Sequence[str],
+        loader: Callable[[list[str]], Awaitable[dict[str, Any]]],
+        ttl: int | None = None,
+    ) -> dict[str, Any]:
+        """Versión por lotes para listados: un ``MGET`` y una sola carga con todas las claves que faltan."""
+        found = await self.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            self.stats["loads"] += 1
+            loaded = await loader(missing)
+            await self.set_many(loaded, ttl)
+            found.update(loaded)
+        return found
@@ -0,0 +1,20 @@
+from fastapi import Request
+
+from src.adapters.kafka_adapter import AsyncKafkaProducer
+from src.adapters.redis_adapter import RedisCache
+from src.services.event_service import EventService
+
+
+def get_kafka_producer(request: Request) -> AsyncKafkaProducer:
+    """Devuelve el productor de Kafka compartido creado en el lifespan."""
+    return request.app.state.kafka_producer
+
+
+def get_event_service(request: Request) -> EventService:
+    """Devuelve el servicio de eventos (índice geoespacial) creado en el lifespan."""
+    return request.app.state.event_service
+
+
+def get_cache(request: Request) -> RedisCache:
+    """Devuelve la caché de respuestas (Redis + L1) creada en el lifespan."""
+    return request.app.state.cache
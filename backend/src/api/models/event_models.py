@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class GeoEventOut(BaseModel):
+    """Evento devuelto por las búsquedas geoespaciales."""
+
+    id: str = Field(description="Identificador `source:id` del evento")
+    lat: float
+    lon: float
+    start: datetime
+    end: datetime
+    distance_km: float | None = Field(default=None, description="Distancia al punto de búsqueda (solo en /nearby)")
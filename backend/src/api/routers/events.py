@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.api.dependencies import get_event_service
+from src.api.models.event_models import GeoEventOut
+from src.services.event_service import EventService, GeoEvent
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+def _timestamp(value: datetime | None) -> float | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _window(start: datetime | None, end: datetime | None) -> tuple[float, float | None]:
+    """Ventana de tiempo de la búsqueda; por defecto, eventos que no han terminado."""
+    window_start = _timestamp(start) or datetime.now(timezone.utc).timestamp()
+    window_end = _timestamp(end)
+    if window_end is not None and window_end < window_start:
+        raise HTTPException(status_code=422, detail="`end` debe ser posterior a `start`")
+    return window_start, window_end
+
+
+def _to_out(event: GeoEvent, distance: float | None = None) -> GeoEventOut:
+    return GeoEventOut(
+        id=event.id,
+        lat=event.lat,
+        lon=event.lon,
+        start=datetime.fromtimestamp(event.start, timezone.utc),
+        end=datetime.fromtimestamp(event.end, timezone.utc),
+        distance_km=round(distance, 3) if distance is not None else None,
+    )
+
+
+@router.get("/nearby", response_model=list[GeoEventOut])
+async def events_nearby(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    radius_km: float = Query(5.0, gt=0, le=100),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    service: EventService = Depends(get_event_service),
+) -> list[GeoEventOut]:
+    """Eventos a menos de ``radius_km`` del punto, ordenados por distancia."""
+    window_start, window_end = _window(start, end)
+    matches = await service.nearby(lat, lon, radius_km, window_start, window_end, limit)
+    return [_to_out(event, distance) for event, distance in matches]
+
+
+@router.get("/in-box", response_model=list[GeoEventOut])
+async def events_in_box(
+    min_lat: float = Query(ge=-90, le=90),
+    min_lon: float = Query(ge=-180, le=180),
+    max_lat: float = Query(ge=-90, le=90),
+    max_lon: float = Query(ge=-180, le=180),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+    service: EventService = Depends(get_event_service),
+) -> list[GeoEventOut]:
+    """Eventos dentro de la vista del mapa (rectángulo ``min``/``max``)."""
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=422, detail="La caja debe cumplir min_lat <= max_lat y min_lon <= max_lon")
+    window_start, window_end = _window(start, end)
+    events = await service.in_box(min_lat, min_lon, max_lat, max_lon, window_start, window_end, limit)
+    return [_to_out(event) for event in events]
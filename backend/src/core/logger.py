@@ -0,0 +1,17 @@
+import os
+import sys
+
+from loguru import logger
+
+# Un único sink a stderr. enqueue=True saca la escritura del log del hilo que
+# lo emite (event loop, hilos de poll de Kafka...), para que un log lento no
+# añada latencia a las peticiones.
+logger.remove()
+logger.add(
+    sys.stderr,
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="{time:YYYY-MM-DD HH:mm:ss.SSS} - {level} - {name}:{line} - {message}",
+    enqueue=True,
+)
+
+__all__ = ["logger"]
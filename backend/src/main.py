@@ -0,0 +1,83 @@
+import asyncio
+import socket
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from redis.exceptions import RedisError
+
+from config import settings
+from src.adapters.cassandra_adapter import close_cassandra_adapter, get_cassandra_adapter
+from src.adapters.kafka_adapter import AsyncKafkaConsumer, AsyncKafkaProducer, run_consumer
+from src.adapters.redis_adapter import RedisCache, RedisGeoIndex, create_redis_clients
+from src.api.routers import events
+from src.core.logger import logger
+from src.services.event_service import EventService
+from src.services.timeline_service import EventTimelineStore
+
+
+def build_background_consumers(app: FastAPI) -> list[tuple[AsyncKafkaConsumer, object]]:
+    """Consumidores que corren dentro del proceso del backend junto a la API.
+
+    Cada entrada es ``(consumidor, handler)``; el handler es una corrutina que
+    recibe el lote de mensajes.
+    """
+    # Cada réplica necesita todos los eventos en su índice en memoria: grupo propio por host
+    events_group = f"{settings.KAFKA_CONSUMER_GROUP}-geo-{socket.gethostname()}"
+    events_consumer = AsyncKafkaConsumer(settings.get_kafka_consumer_config(events_group), [settings.EVENTS_TOPIC])
+    consumers = [(events_consumer, app.state.event_service.handle_messages)]
+    if app.state.timeline is not None:
+        # La línea de tiempo en Cassandra se escribe una sola vez: grupo compartido entre réplicas
+        timeline_consumer = AsyncKafkaConsumer(
+            settings.get_kafka_consumer_config(settings.KAFKA_TIMELINE_GROUP), [settings.EVENTS_TOPIC]
+        )
+        consumers.append((timeline_consumer, app.state.timeline.handle_messages))
+    return consumers
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):  # noqa: ANN201
+    """Crea los clientes compartidos al arrancar y los cierra ordenadamente al parar."""
+    producer = AsyncKafkaProducer(settings.get_kafka_producer_config())
+    producer.start()
+    app.state.kafka_producer = producer
+    logger.info(f"Productor de Kafka compartido iniciado contra {settings.KAFKA_BROKERS}")
+
+    redis_clients = create_redis_clients()
+    app.state.redis = redis_clients
+    app.state.cache = RedisCache.from_settings(redis_clients)
+    event_service = EventService(
+        geo_store=RedisGeoIndex(redis_clients.master, settings.EVENTS_GEO_KEY, reader=redis_clients.replica)
+    )
+    app.state.event_service = event_service
+    try:
+        await event_service.warm_up()
+    except RedisError as e:
+        # Sin Redis la réplica sigue funcionando con su índice en memoria
+        logger.warning(f"No se pudo precargar el índice geoespacial desde Redis: {e}")
+        event_service.ready = True
+
+    # Cassandra es opcional: sin CASSANDRA_CONTACT_POINTS no se escribe la línea de tiempo
+    app.state.timeline = None
+    if settings.CASSANDRA_CONTACT_POINTS:
+        adapter = await asyncio.to_thread(get_cassandra_adapter)
+        app.state.timeline = EventTimelineStore(adapter)
+
+    consumers = build_background_consumers(app)
+    tasks = []
+    for consumer, handler in consumers:
+        await consumer.start()
+        tasks.append(asyncio.create_task(run_consumer(consumer, handler)))
+    try:
+        yield
+    finally:
+        for consumer, _ in consumers:
+            await consumer.stop()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await producer.close()
+        await redis_clients.aclose()
+        await asyncio.to_thread(close_cassandra_adapter)
+        logger.info("Clientes de Kafka, Redis y Cassandra cerrados")
+
+
+app = FastAPI(title="LoopCity API", lifespan=lifespan)
+app.include_router(events.router)
@@ -0,0 +1,424 @@
+import heapq
+import math
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from confluent_kafka import Message
+from loopcity_messaging.keys import entity_id, extract_coordinates
+from redis.exceptions import RedisError
+
+from config import settings
+from src.adapters.kafka_adapter import decode_message
+from src.adapters.redis_adapter import RedisGeoIndex
+from src.core.geo import KM_PER_DEGREE, haversine_km
+from src.core.logger import logger
+
+# Dónde publica cada fuente el inicio y el fin del evento (Ticketmaster, Eventbrite,
+# Meetup y el evento canónico event.v1)
+START_PATHS = (
+    ("dates", "start", "dateTime"),
+    ("dates", "start", "localDate"),
+    ("start", "utc"),
+    ("dateTime",),
+    ("start",),
+)
+END_PATHS = (
+    ("dates", "end", "dateTime"),
+    ("end", "utc"),
+    ("endTime",),
+    ("end",),
+)
+
+
+@dataclass(slots=True)
+class GeoEvent:
+    """Evento activo en el índice: posición y ventana de tiempo (timestamps UNIX)."""
+
+    id: str
+    lat: float
+    lon: float
+    start: float
+    end: float
+
+    def overlaps(self, start: float | None, end: float | None) -> bool:
+        return (start is None or self.end >= start) and (end is None or self.start <= end)
+
+
+def _get_path(item: Any, path: tuple) -> Any:
+    for step in path:
+        if not isinstance(item, dict) or step not in item:
+            return None
+        item = item[step]
+    return item
+
+
+def _parse_time(value: Any) -> float | None:
+    if isinstance(value, int | float):
+        return float(value)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _first_time(data: dict, paths: tuple) -> float | None:
+    for path in paths:
+        parsed = _parse_time(_get_path(data, path))
+        if parsed is not None:
+            return parsed
+    return None
+
+
+def event_times(data: dict, default_duration: float | None = None) -> tuple[float, float] | None:
+    """``(inicio, fin)`` del evento como timestamps UNIX, o None si no publica el inicio.
+
+    Sin hora de fin (o con una anterior al inicio) se asume ``EVENTS_DEFAULT_DURATION_HOURS``.
+    """
+    start = _first_time(data, START_PATHS)
+    if start is None:
+        return None
+    end = _first_time(data, END_PATHS)
+    if end is None or end < start:
+        end = start + (default_duration or settings.EVENTS_DEFAULT_DURATION_HOURS * 3600)
+    return start, end
+
+
+def event_from_payload(payload: Any, default_duration: float | None = None) -> GeoEvent | None:
+    """Extrae un ``GeoEvent`` de un mensaje de ``raw_events`` (sobre ``{"metadata", "data"}``).
+
+    Devuelve None si el evento no tiene coordenadas o fecha de inicio. El id es
+    ``source:entity_id``, el mismo que la clave de partición por entidad.
+    """
+    if not isinstance(payload, dict):
+        return None
+    data = payload.get("data", payload)
+    metadata = payload.get("metadata", {})
+    if not isinstance(data, dict):
+        return None
+    eid = metadata.get("entity_id") or entity_id(data)
+    coordinates = extract_coordinates(data)
+    times = event_times(data, default_duration)
+    if eid is None or coordinates is None or times is None:
+        return None
+    source_api = metadata.get("source_api") or data.get("source_api") or "unknown"
+    return GeoEvent(f"{source_api}:{eid}", coordinates[0], coordinates[1], *times)
+
+
+class GeoGridIndex:
+    """Índice en memoria de eventos activos sobre una rejilla de celdas de ``cell_km``.
+
+    Una búsqueda por radio solo recorre las celdas que tocan el círculo, así que
+    su coste depende de los eventos cercanos y no del total. Las actualizaciones
+    son incrementales (``upsert`` mueve un evento de celda) y ``expire`` descarta
+    los eventos terminados usando un heap por hora de fin.
+    """
+
+    def __init__(self, cell_km: float = 1.0) -> None:
+        """Inicializa la rejilla.
+
+        Args:
+            cell_km: Lado de cada celda en km (en latitud; en longitud se estrecha con el coseno).
+        """
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self._cells: dict[tuple[int, int], dict[str, GeoEvent]] = {}
+        self._events: dict[str, GeoEvent] = {}
+        self._ends: list[tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self._events
+
+    def get(self, event_id: str) -> GeoEvent | None:
+        return self._events.get(event_id)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def upsert(self, event: GeoEvent) -> None:
+        """Añade el evento o lo actualiza (moviéndolo de celda si ha cambiado de sitio)."""
+        previous = self._events.get(event.id)
+        if previous is not None:
+            self._discard(previous)
+        self._events[event.id] = event
+        self._cells.setdefault(self._cell(event.lat, event.lon), {})[event.id] = event
+        if previous is None or previous.end != event.end:
+            heapq.heappush(self._ends, (event.end, event.id))
+
+    def _discard(self, event: GeoEvent) -> None:
+        cell = self._cell(event.lat, event.lon)
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.pop(event.id, None)
+            if not bucket:
+                del self._cells[cell]
+
+    def remove(self, event_id: str) -> bool:
+        event = self._events.pop(event_id, None)
+        if event is None:
+            return False
+        self._discard(event)
+        return True
+
+    def expire(self, now: float) -> list[str]:
+        """Elimina los eventos que terminaron antes de ``now``. Devuelve sus ids."""
+        expired = []
+        while self._ends and self._ends[0][0] < now:
+            end, event_id = heapq.heappop(self._ends)
+            event = self._events.get(event_id)
+            # Entradas obsoletas del heap (evento actualizado con otra hora de fin o ya borrado)
+            if event is not None and event.end == end:
+                self.remove(event_id)
+                expired.append(event_id)
+        return expired
+
+    def _candidates(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> Iterable[GeoEvent]:
+        lat0, lon0 = self._cell(min_lat, min_lon)
+        lat1, lon1 = self._cell(max_lat, max_lon)
+        if (lat1 - lat0 + 1) * (lon1 - lon0 + 1) > len(self._cells):
+            # Caja enorme con pocos eventos: más barato recorrer las celdas ocupadas
+            for (clat, clon), bucket in self._cells.items():
+                if lat0 <= clat <= lat1 and lon0 <= clon <= lon1:
+                    yield from bucket.values()
+            return
+        for clat in range(lat0, lat1 + 1):
+            for clon in range(lon0, lon1 + 1):
+                bucket = self._cells.get((clat, clon))
+                if bucket:
+                    yield from bucket.values()
+
+    def radius(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        start: float | None = None,
+        end: float | None = None,
+        limit: int | None = None,
+    ) -> list[tuple[GeoEvent, float]]:
+        """Eventos a menos de ``radius_km`` que se solapan con ``[start, end]``, por distancia."""
+        dlat = radius_km / KM_PER_DEGREE
+        # Coseno en el borde más cercano al polo: las celdas son más estrechas allí (cota conservadora)
+        cos_lat = max(math.cos(math.radians(min(90.0, abs(lat) + dlat))), 1e-6)
+        dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+        if limit is not None:
+            return self._nearest(lat, lon, radius_km, start, end, limit, dlat, dlon, cos_lat)
+        matches = []
+        for event in self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon):
+            if not event.overlaps(start, end):
+                continue
+            distance = haversine_km(lat, lon, event.lat, event.lon)
+            if distance <= radius_km:
+                matches.append((event, distance))
+        matches.sort(key=lambda match: match[1])
+        return matches
+
+    def _nearest(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        start: float | None,
+        end: float | None,
+        limit: int,
+        dlat: float,
+        dlon: float,
+        cos_lat: float,
+    ) -> list[tuple[GeoEvent, float]]:
+        """Los ``limit`` más cercanos recorriendo anillos de celdas desde el centro.
+
+        Tras el anillo ``r`` está cubierto todo lo que queda a menos de ``r`` celdas;
+        si ya hay ``limit`` resultados dentro de esa distancia no hace falta seguir,
+        así que en zonas densas solo se miran unas pocas celdas.
+        """
+        center_lat, center_lon = self._cell(lat, lon)
+        max_dy = math.ceil(dlat / self.cell_deg) + 1
+        max_dx = math.ceil(dlon / self.cell_deg) + 1
+        ring_km = self.cell_deg * KM_PER_DEGREE * min(1.0, cos_lat)
+        best: list[tuple[float, int, GeoEvent]] = []  # max-heap por distancia (negada)
+        seq = 0
+        for ring in range(max(max_dy, max_dx) + 1):
+            for dy in range(-min(ring, max_dy), min(ring, max_dy) + 1):
+                if abs(dy) == ring:
+                    dxs = range(-min(ring, max_dx), min(ring, max_dx) + 1)
+                elif ring <= max_dx:
+                    dxs = (-ring, ring)
+                else:
+                    continue
+                for dx in dxs:
+                    bucket = self._cells.get((center_lat + dy, center_lon + dx))
+                    if not bucket:
+                        continue
+                    for event in bucket.values():
+                        if not event.overlaps(start, end):
+                            continue
+                        distance = haversine_km(lat, lon, event.lat, event.lon)
+                        if distance > radius_km:
+                            continue
+                        seq += 1
+                        if len(best) < limit:
+                            heapq.heappush(best, (-distance, seq, event))
+                        elif distance < -best[0][0]:
+                            heapq.heapreplace(best, (-distance, seq, event))
+            if len(best) >= limit and -best[0][0] <= ring * ring_km:
+                break
+        return [(event, -neg) for neg, _, event in sorted(best, key=lambda item: (-item[0], item[1]))]
+
+    def box(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        start: float | None = None,
+        end: float | None = None,
+        limit: int | None = None,
+    ) -> list[GeoEvent]:
+        """Eventos dentro del rectángulo que se solapan con ``[start, end]`` (p. ej. la vista del mapa)."""
+        matches = []
+        for event in self._candidates(min_lat, min_lon, max_lat, max_lon):
+            if min_lat <= event.lat <= max_lat and min_lon <= event.lon <= max_lon and event.overlaps(start, end):
+                matches.append(event)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+
+
+class EventService:
+    """Búsquedas geoespaciales de eventos ("cerca de mí" y vista del mapa).
+
+    Cada réplica mantiene un ``GeoGridIndex`` en memoria alimentado desde el topic
+    de eventos. Si hay Redis, los mismos cambios se escriben en un índice ``GEO``
+    compartido: una réplica recién arrancada se precarga desde él (``warm_up``) y,
+    mientras no lo ha hecho, responde consultando Redis directamente.
+    """
+
+    def __init__(
+        self,
+        index: GeoGridIndex | None = None,
+        geo_store: RedisGeoIndex | None = None,
+        expire_interval: float = 60.0,
+    ) -> None:
+        """Inicializa el servicio.
+
+        Args:
+            index: Índice en memoria (por defecto una rejilla de ``EVENTS_GEO_CELL_KM``).
+            geo_store: Índice GEO compartido en Redis (opcional).
+            expire_interval: Cada cuántos segundos se purgan los eventos terminados.
+        """
+        self.index = index or GeoGridIndex(settings.EVENTS_GEO_CELL_KM)
+        self.geo_store = geo_store
+        self.expire_interval = expire_interval
+        self.ready = geo_store is None
+        self._last_expire = 0.0
+
+    async def warm_up(self, now: float | None = None) -> int:
+        """Carga en memoria los eventos activos del índice compartido. Devuelve cuántos."""
+        if self.geo_store is None:
+            self.ready = True
+            return len(self.index)
+        loaded = 0
+        async for batch in self.geo_store.scan_active(now or time.time()):
+            for event_id, lat, lon, start, end in batch:
+                if event_id not in self.index:
+                    self.index.upsert(GeoEvent(event_id, lat, lon, start, end))
+                    loaded += 1
+        self.ready = True
+        logger.info(f"Índice geoespacial precargado desde Redis: {loaded} eventos activos")
+        return loaded
+
+    async def apply(self, events: list[GeoEvent], now: float | None = None) -> None:
+        """Aplica altas/cambios de eventos al índice local y al compartido."""
+        now = now or time.time()
+        active = [event for event in events if event.end >= now]
+        for event in active:
+            self.index.upsert(event)
+        expire = now - self._last_expire >= self.expire_interval
+        if expire:
+            self._last_expire = now
+            expired = self.index.expire(now)
+            if expired:
+                logger.debug(f"Índice geoespacial: {len(expired)} eventos terminados eliminados")
+        if self.geo_store is None:
+            return
+        try:
+            if active:
+                await self.geo_store.upsert((e.id, e.lat, e.lon, e.start, e.end) for e in active)
+            if expire:
+                await self.geo_store.expire(now)
+        except RedisError as e:
+            # El índice local ya está al día; el compartido se reconstruye con los siguientes cambios
+            logger.warning(f"No se pudo actualizar el índice geoespacial en Redis: {e}")
+
+    async def handle_messages(self, batch: list[Message]) -> None:
+        """Handler del consumidor del topic de eventos (ver ``main.build_background_consumers``)."""
+        events = []
+        for msg in batch:
+            try:
+                event = event_from_payload(decode_message(msg))
+            except Exception as e:  # un mensaje corrupto no debe parar el consumidor
+                logger.warning(f"Mensaje de '{msg.topic()}' [{msg.partition()}@{msg.offset()}] no decodificable: {e}")
+                continue
+            if event is not None:
+                events.append(event)
+        await self.apply(events)
+
+    async def nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        start: float | None = None,
+        end: float | None = None,
+        limit: int = 50,
+    ) -> list[tuple[GeoEvent, float]]:
+        """Eventos a menos de ``radius_km`` de ``(lat, lon)`` en la ventana de tiempo, por distancia."""
+        if self.ready:
+            return self.index.radius(lat, lon, radius_km, start, end, limit)
+        hits = await self.geo_store.search_radius(lat, lon, radius_km)
+        bounds = await self.geo_store.time_bounds([event_id for event_id, *_ in hits])
+        results = []
+        for (event_id, distance, event_lat, event_lon), (event_start, event_end) in zip(hits, bounds, strict=True):
+            if event_start is None or event_end is None:
+                continue
+            event = GeoEvent(event_id, event_lat, event_lon, event_start, event_end)
+            if event.overlaps(start, end):
+                results.append((event, distance))
+                if len(results) >= limit:
+                    break
+        return results
+
+    async def in_box(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        start: float | None = None,
+        end: float | None = None,
+        limit: int = 500,
+    ) -> list[GeoEvent]:
+        """Eventos dentro del rectángulo en la ventana de tiempo."""
+        if self.ready:
+            return self.index.box(min_lat, min_lon, max_lat, max_lon, start, end, limit)
+        hits = await self.geo_store.search_box(min_lat, min_lon, max_lat, max_lon)
+        bounds = await self.geo_store.time_bounds([event_id for event_id, *_ in hits])
+        results = []
+        for (event_id, event_lat, event_lon), (event_start, event_end) in zip(hits, bounds, strict=True):
+            if event_start is None or event_end is None:
+                continue
+            event = GeoEvent(event_id, event_lat, event_lon, event_start, event_end)
+            if event.overlaps(start, end):
+                results.append(event)
+                if len(results) >= limit:
+                    break
+        return results
@@ -0,0 +1,146 @@
+import asyncio
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from confluent_kafka import Message
+from loopcity_messaging.keys import entity_id, extract_city, extract_coordinates
+
+from config import settings
+from src.adapters.cassandra_adapter import CassandraAdapter, WriteResult
+from src.adapters.kafka_adapter import decode_message
+from src.core.logger import logger
+from src.services.event_service import event_times
+
+TIMELINE_COLUMNS = (
+    "city",
+    "day",
+    "start_ts",
+    "event_id",
+    "source_api",
+    "name",
+    "lat",
+    "lon",
+    "end_ts",
+    "content_type",
+    "payload",
+)
+INSERT_TIMELINE = (
+    f"INSERT INTO event_timeline ({', '.join(TIMELINE_COLUMNS)}) VALUES ({', '.join('?' * len(TIMELINE_COLUMNS))})"
+)
+SELECT_TIMELINE = (
+    f"SELECT {', '.join(TIMELINE_COLUMNS)} FROM event_timeline "
+    "WHERE city = ? AND day = ? AND start_ts >= ? AND start_ts < ?"
+)
+
+
+def _event_name(data: dict) -> str | None:
+    # Eventbrite publica {"text": ..., "html": ...}; el resto un texto
+    name = data.get("name") or data.get("title")
+    if isinstance(name, dict):
+        name = name.get("text")
+    return name if isinstance(name, str) else None
+
+
+def _header(msg: Message, name: str) -> str | None:
+    for key, value in msg.headers() or []:
+        if key == name and value is not None:
+            return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+    return None
+
+
+def timeline_row(msg: Message) -> tuple | None:
+    """Fila de ``event_timeline`` (en el orden de ``TIMELINE_COLUMNS``) para un mensaje de ``raw_events``.
+
+    Devuelve None si el evento no tiene ciudad, identificador o fecha de inicio.
+    El payload se guarda tal cual llegó (con su ``content-type``), sin recodificar.
+    """
+    payload = decode_message(msg)
+    if not isinstance(payload, dict):
+        return None
+    data = payload.get("data", payload)
+    metadata = payload.get("metadata", {})
+    if not isinstance(data, dict):
+        return None
+    eid = metadata.get("entity_id") or entity_id(data)
+    city = extract_city(data)
+    times = event_times(data)
+    if eid is None or city is None or times is None:
+        return None
+    source_api = metadata.get("source_api") or data.get("source_api") or "unknown"
+    start = datetime.fromtimestamp(times[0], tz=timezone.utc)
+    coordinates = extract_coordinates(data) or (None, None)
+    return (
+        city,
+        start.date(),
+        start,
+        f"{source_api}:{eid}",
+        source_api,
+        _event_name(data),
+        coordinates[0],
+        coordinates[1],
+        datetime.fromtimestamp(times[1], tz=timezone.utc),
+        _header(msg, "content-type") or "application/json",
+        msg.value(),
+    )
+
+
+def _partition_key(row: tuple) -> tuple[str, date]:
+    return row[0], row[1]
+
+
+class EventTimelineStore:
+    """Línea de tiempo de eventos por ciudad y día en Cassandra (tabla ``event_timeline``).
+
+    Se alimenta desde ``raw_events`` con un grupo de consumidores compartido por
+    todas las réplicas (``KAFKA_TIMELINE_GROUP``): cada lote se escribe agrupado
+    por partición ``(city, day)`` con ``CassandraAdapter.write_many``.
+    """
+
+    def __init__(self, adapter: CassandraAdapter, concurrency: int | None = None) -> None:
+        """Inicializa el almacén.
+
+        Args:
+            adapter: Adaptador de Cassandra compartido del proceso.
+            concurrency: Escrituras en vuelo (por defecto ``CASSANDRA_WRITE_CONCURRENCY``).
+        """
+        self.adapter = adapter
+        self.concurrency = concurrency
+
+    def write(self, rows: list[tuple]) -> WriteResult:
+        return self.adapter.write_many(INSERT_TIMELINE, rows, _partition_key, concurrency=self.concurrency)
+
+    async def handle_messages(self, batch: list[Message]) -> None:
+        """Handler del consumidor de la línea de tiempo (ver ``main.build_background_consumers``).
+
+        Si alguna escritura falla se propaga el error para no confirmar el lote:
+        los INSERT son idempotentes, así que reescribirlo es seguro.
+        """
+        rows = []
+        for msg in batch:
+            try:
+                row = timeline_row(msg)
+            except Exception as e:  # un mensaje corrupto no debe parar el consumidor
+                logger.warning(f"Mensaje de '{msg.topic()}' [{msg.partition()}@{msg.offset()}] no decodificable: {e}")
+                continue
+            if row is not None:
+                rows.append(row)
+        if not rows:
+            return
+        result = await asyncio.to_thread(self.write, rows)
+        if result.errors:
+            raise result.errors[0]
+        logger.debug(f"Línea de tiempo: {result.rows} eventos en {result.partitions} particiones")
+
+    def read(self, city: str, start: datetime, end: datetime, fetch_size: int | None = None) -> Iterator[Any]:
+        """Genera los eventos de ``city`` que empiezan en ``[start, end)``, en orden de inicio.
+
+        Recorre una partición por día y lee cada una página a página, así que
+        rangos largos no se cargan enteros en memoria. Pensado para ejecutarse
+        en un hilo (``asyncio.to_thread``) o en scripts batch.
+        """
+        day = start.astimezone(timezone.utc).date()
+        last_day = end.astimezone(timezone.utc).date()
+        while day <= last_day:
+            yield from self.adapter.stream(SELECT_TIMELINE, (city, day, start, end), fetch_size or settings.CASSANDRA_FETCH_SIZE)
+            day += timedelta(days=1)
@@ -0,0 +1,156 @@
+import threading
+import time
+
+from cassandra.cqltypes import Int32Type, UTF8Type
+from cassandra.protocol import ColumnMetadata
+from cassandra.query import BatchStatement, BoundStatement, PreparedStatement
+
+from src.adapters.cassandra_adapter import CassandraAdapter
+
+INSERT = "INSERT INTO t (city, n) VALUES (?, ?)"
+SELECT = "SELECT city, n FROM t WHERE city = ?"
+
+
+class FakeFuture:
+    """``ResponseFuture`` mínimo: resuelve en otro hilo tras ``delay`` segundos."""
+
+    has_more_pages = False
+    # Atributos que lee el ResultSet que construye execute_concurrent
+    _col_names = None
+    _col_types = None
+    _continuous_paging_session = None
+
+    def __init__(self, session, error=None):
+        self.session = session
+        self.error = error
+
+    def add_callbacks(self, callback, callback_args=(), errback=None, errback_args=(), **_):
+        def resolve():
+            time.sleep(self.session.delay)
+            with self.session.lock:
+                self.session.in_flight -= 1
+            if self.error is not None:
+                errback(self.error, *errback_args)
+            else:
+                callback([], *callback_args)
+
+        threading.Thread(target=resolve).start()
+
+    def clear_callbacks(self):
+        pass
+
+
+class FakeResult:
+    def __init__(self, pages, index):
+        self.pages = pages
+        self.index = index
+
+    @property
+    def current_rows(self):
+        return self.pages[self.index]
+
+    @property
+    def has_more_pages(self):
+        return self.index + 1 < len(self.pages)
+
+    @property
+    def paging_state(self):
+        return str(self.index + 1).encode() if self.has_more_pages else None
+
+    def fetch_next_page(self):
+        self.index += 1
+
+
+class FakeSession:
+    """Sesión en memoria: prepara sentencias reales y registra lo que se ejecuta."""
+
+    def __init__(self, delay=0.001, fail_on=None, pages=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.pages = pages or [[]]
+        self.prepares = []
+        self.executed = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def prepare(self, cql):
+        self.prepares.append(cql)
+        columns = [ColumnMetadata("ks", "t", "city", UTF8Type), ColumnMetadata("ks", "t", "n", Int32Type)]
+        return PreparedStatement(columns, b"id", [0], cql, "ks", 5, [], None)
+
+    def execute_async(self, statement, parameters=None, **_):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.executed.append((statement, parameters))
+        city = statement.routing_key if isinstance(statement, BatchStatement) else parameters[0].encode()
+        return FakeFuture(self, error=RuntimeError("timeout") if city == self.fail_on else None)
+
+    def execute(self, statement, parameters=None, paging_state=None):
+        self.executed.append((statement, paging_state))
+        return FakeResult(self.pages, int(paging_state) if paging_state else 0)
+
+
+def test_statements_are_prepared_once():
+    session = FakeSession()
+    adapter = CassandraAdapter(session)
+    assert adapter.prepare(INSERT) is adapter.prepare(INSERT)
+    adapter.write_many(INSERT, [("madrid", 1)], lambda row: row[0])
+    assert session.prepares == [INSERT]
+
+
+def test_rows_are_grouped_into_single_partition_batches():
+    session = FakeSession()
+    adapter = CassandraAdapter(session)
+    rows = [("madrid", n) for n in range(120)] + [("bogota", 1)]
+
+    result = adapter.write_many(INSERT, rows, lambda row: row[0], max_batch_rows=50)
+
+    assert (result.rows, result.partitions, result.statements, result.failed) == (121, 2, 4, 0)
+    batches = [statement for statement, _ in session.executed if isinstance(statement, BatchStatement)]
+    assert sorted(len(batch) for batch in batches) == [20, 50, 50]
+    assert all(batch.routing_key == b"madrid" for batch in batches)
+    # Una partición con una sola fila no necesita batch
+    assert [params for statement, params in session.executed if isinstance(statement, PreparedStatement)] == [
+        ("bogota", 1)
+    ]
+
+
+def test_concurrency_is_bounded():
+    session = FakeSession(delay=0.005)
+    adapter = CassandraAdapter(session)
+    result = adapter.write_many(INSERT, [(f"city{n}", n) for n in range(40)], lambda row: row[0], concurrency=4)
+    assert result.statements == 40
+    assert 1 < session.max_in_flight <= 4
+
+
+def test_failures_are_reported_without_aborting():
+    session = FakeSession(fail_on=b"lima")
+    adapter = CassandraAdapter(session)
+    rows = [("lima", 1), ("lima", 2), ("quito", 1), ("cali", 1)]
+    result = adapter.write_many(INSERT, rows, lambda row: row[0])
+    assert result.statements == 3
+    assert result.failed == 1 and isinstance(result.errors[0], RuntimeError)
+
+
+def test_stream_reads_page_by_page():
+    session = FakeSession(pages=[[("madrid", 1), ("madrid", 2)], [("madrid", 3)], []])
+    adapter = CassandraAdapter(session)
+
+    rows = adapter.stream(SELECT, ("madrid",), fetch_size=2)
+    assert next(rows) == ("madrid", 1)
+    assert len(session.executed) == 1  # solo se ha pedido la primera página
+    assert list(rows) == [("madrid", 2), ("madrid", 3)]
+
+    statement, _ = session.executed[0]
+    assert isinstance(statement, BoundStatement) and statement.fetch_size == 2
+
+
+def test_stream_pages_can_resume_from_paging_state():
+    session = FakeSession(pages=[[1, 2], [3, 4], [5]])
+    adapter = CassandraAdapter(session)
+    rows, state = next(adapter.stream_pages(SELECT, ("madrid",)))
+    assert rows == [1, 2] and state == b"1"
+    resumed = list(adapter.stream_pages(SELECT, ("madrid",), paging_state=state))
+    assert resumed == [([3, 4], b"2"), ([5], None)]
@@ -0,0 +1,123 @@
+import random
+import time
+
+import fakeredis
+import httpx
+from fastapi import FastAPI
+
+from src.adapters.redis_adapter import RedisGeoIndex
+from src.api.routers import events
+from src.core.geo import haversine_km
+from src.services.event_service import EventService, GeoEvent, GeoGridIndex, event_from_payload
+
+NOW = 1_800_000_000.0
+HOUR = 3600.0
+
+TICKETMASTER_MESSAGE = {
+    "metadata": {"source_api": "ticketmaster", "entity_id": "TM001"},
+    "data": {
+        "id": "TM001",
+        "dates": {"start": {"dateTime": "2027-01-15T20:00:00Z"}},
+        "_embedded": {"venues": [{"location": {"latitude": "40.4239", "longitude": "-3.6717"}}]},
+    },
+}
+
+
+def random_events(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        GeoEvent(f"e{i}", 40.0 + rng.random(), -4.0 + rng.random(), NOW + rng.uniform(-5, 5) * HOUR, NOW + rng.uniform(5, 10) * HOUR)
+        for i in range(n)
+    ]
+
+
+def test_event_from_payload_reads_source_shapes():
+    event = event_from_payload(TICKETMASTER_MESSAGE)
+    assert event.id == "ticketmaster:TM001"
+    assert (event.lat, event.lon) == (40.4239, -3.6717)
+    assert event.end - event.start == 3 * HOUR  # sin hora de fin: duración por defecto
+
+    eventbrite = {
+        "metadata": {"source_api": "eventbrite"},
+        "data": {"id": "EB1", "start": {"utc": "2027-01-15T18:00:00Z"}, "end": {"utc": "2027-01-15T19:30:00Z"},
+                 "venue": {"latitude": "41.38", "longitude": "2.17"}},
+    }
+    assert event_from_payload(eventbrite).end - event_from_payload(eventbrite).start == 1.5 * HOUR
+    assert event_from_payload({"metadata": {}, "data": {"id": "x", "name": "sin coordenadas"}}) is None
+
+
+def test_radius_matches_brute_force_and_is_sorted():
+    index = GeoGridIndex(cell_km=1.0)
+    points = random_events(5000)
+    for event in points:
+        index.upsert(event)
+
+    lat, lon, radius = 40.5, -3.5, 7.5
+    expected = sorted(e.id for e in points if haversine_km(lat, lon, e.lat, e.lon) <= radius)
+    matches = index.radius(lat, lon, radius)
+    assert sorted(event.id for event, _ in matches) == expected
+    distances = [distance for _, distance in matches]
+    assert distances == sorted(distances)
+    # Con límite se recorren anillos de celdas desde el centro: mismos k más cercanos
+    rng = random.Random(3)
+    for _ in range(20):
+        qlat, qlon, k = 40.0 + rng.random(), -4.0 + rng.random(), rng.choice([1, 10, 50])
+        full = index.radius(qlat, qlon, 20, start=NOW)
+        assert [d for _, d in index.radius(qlat, qlon, 20, start=NOW, limit=k)] == [d for _, d in full[:k]]
+
+
+def test_time_window_box_update_and_expire():
+    index = GeoGridIndex(cell_km=1.0)
+    index.upsert(GeoEvent("past", 40.41, -3.70, NOW - 5 * HOUR, NOW - 2 * HOUR))
+    index.upsert(GeoEvent("live", 40.42, -3.70, NOW - HOUR, NOW + HOUR))
+    index.upsert(GeoEvent("later", 40.43, -3.70, NOW + 2 * HOUR, NOW + 4 * HOUR))
+
+    assert [e.id for e, _ in index.radius(40.41, -3.70, 5, start=NOW, end=NOW + HOUR)] == ["live"]
+    assert {e.id for e in index.box(40.0, -4.0, 41.0, -3.0, start=NOW)} == {"live", "later"}
+
+    # Un cambio de sede mueve el evento de celda
+    index.upsert(GeoEvent("later", 41.38, 2.17, NOW + 2 * HOUR, NOW + 4 * HOUR))
+    assert [e.id for e, _ in index.radius(41.38, 2.17, 1)] == ["later"]
+    assert "later" not in {e.id for e, _ in index.radius(40.41, -3.70, 5)}
+
+    assert index.expire(NOW) == ["past"]
+    assert len(index) == 2
+
+
+async def test_shared_redis_index_serves_cold_replicas():
+    client = fakeredis.FakeAsyncRedis()
+    writer = EventService(GeoGridIndex(), RedisGeoIndex(client))
+    points = random_events(500)
+    await writer.apply(points, now=NOW)
+
+    # Réplica recién arrancada: antes de precargarse responde desde Redis
+    cold = EventService(GeoGridIndex(), RedisGeoIndex(client))
+    assert not cold.ready
+    from_redis = await cold.nearby(40.5, -3.5, 10, start=NOW, limit=1000)
+    from_local = await writer.nearby(40.5, -3.5, 10, start=NOW, limit=1000)
+    assert [e.id for e, _ in from_redis] == [e.id for e, _ in from_local]
+    box_redis = await cold.in_box(40.2, -3.8, 40.6, -3.4, start=NOW)
+    box_local = await writer.in_box(40.2, -3.8, 40.6, -3.4, start=NOW)
+    assert {e.id for e in box_redis} == {e.id for e in box_local}
+
+    assert await cold.warm_up(now=NOW) == 500
+    assert cold.ready and len(cold.index) == 500
+
+
+async def test_nearby_endpoint():
+    service = EventService(GeoGridIndex())
+    now = time.time()
+    await service.apply([GeoEvent("ticketmaster:TM001", 40.4239, -3.6717, now, now + HOUR)])
+    app = FastAPI()
+    app.include_router(events.router)
+    app.state.event_service = service
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/events/nearby", params={"lat": 40.4168, "lon": -3.7038, "radius_km": 5})
+        assert response.status_code == 200
+        body = response.json()
+        assert [event["id"] for event in body] == ["ticketmaster:TM001"]
+        assert 2 < body[0]["distance_km"] < 4
+
+        response = await client.get("/events/in-box", params={"min_lat": 41, "min_lon": -4, "max_lat": 40, "max_lon": -3})
+        assert response.status_code == 422
@@ -0,0 +1,243 @@
+import asyncio
+import threading
+
+import pytest
+from confluent_kafka import KafkaError, KafkaException
+
+from src.adapters.kafka_adapter import AsyncKafkaConsumer, AsyncKafkaProducer, decode_message, run_consumer
+
+
+class FakeMessage:
+    def __init__(self, topic, value, key=None, headers=None, partition=0, offset=0):
+        self._topic, self._value, self._key, self._headers = topic, value, key, headers
+        self._partition, self._offset = partition, offset
+
+    def error(self):
+        return None
+
+    def topic(self):
+        return self._topic
+
+    def value(self):
+        return self._value
+
+    def key(self):
+        return self._key
+
+    def headers(self):
+        return self._headers
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+
+class FakeProducer:
+    """Imita la cola local de librdkafka: produce() encola y poll() entrega."""
+
+    def __init__(self, config, capacity=1000, fail_topics=()):
+        self.config = config
+        self.capacity = capacity
+        self.fail_topics = set(fail_topics)
+        self.pending = []
+        self.delivered = []
+        self.lock = threading.Lock()
+
+    def produce(self, topic, value=None, key=None, headers=None, on_delivery=None):
+        with self.lock:
+            if len(self.pending) >= self.capacity:
+                raise BufferError("Local: Queue full")
+            self.pending.append((FakeMessage(topic, value, key, headers), on_delivery))
+
+    def poll(self, timeout=0):
+        with self.lock:
+            batch, self.pending = self.pending, []
+        for msg, callback in batch:
+            if msg.topic() in self.fail_topics:
+                callback(KafkaError(KafkaError._MSG_TIMED_OUT), msg)
+            else:
+                self.delivered.append(msg)
+                callback(None, msg)
+        if not batch:
+            threading.Event().wait(min(timeout, 0.01))
+        return len(batch)
+
+    def flush(self, timeout=None):
+        self.poll(0)
+        return 0
+
+    def __len__(self):
+        return len(self.pending)
+
+
+def make_producer(**kwargs):
+    holder = {}
+
+    def factory(config):
+        holder["fake"] = FakeProducer(config, **kwargs)
+        return holder["fake"]
+
+    producer = AsyncKafkaProducer({"bootstrap.servers": "fake"}, poll_timeout=0.01, producer_factory=factory)
+    return producer, holder["fake"]
+
+
+async def test_produce_resolves_from_delivery_callback():
+    producer, fake = make_producer()
+    producer.start()
+    try:
+        msg = await producer.send_and_wait("raw_events", b"payload", key=b"k")
+        assert msg.topic() == "raw_events"
+        assert msg.value() == b"payload"
+        assert fake.delivered == [msg]
+    finally:
+        await producer.close()
+
+
+async def test_delivery_error_is_raised_on_the_future():
+    producer, _ = make_producer(fail_topics={"broken"})
+    producer.start()
+    try:
+        with pytest.raises(KafkaException):
+            await producer.send_and_wait("broken", b"x")
+    finally:
+        await producer.close()
+
+
+async def test_full_queue_waits_instead_of_dropping():
+    producer, fake = make_producer(capacity=5)
+    producer.start()
+    try:
+        futures = [await producer.produce("raw_events", str(i).encode()) for i in range(50)]
+        await asyncio.gather(*futures)
+        assert [m.value() for m in fake.delivered] == [str(i).encode() for i in range(50)]
+    finally:
+        await producer.close()
+
+
+async def test_full_queue_raises_after_backpressure_timeout():
+    producer = AsyncKafkaProducer(
+        {},
+        backpressure_wait=0.001,
+        backpressure_timeout=0.02,
+        producer_factory=lambda conf: FakeProducer(conf, capacity=0),
+    )
+    with pytest.raises(BufferError):
+        await producer.produce("raw_events", b"x")
+
+
+async def test_send_json_encodes_payload_and_key():
+    producer, fake = make_producer()
+    producer.start()
+    try:
+        msg = await (await producer.send_json("raw_events", {"id": "TM001"}, key="TM001"))
+        assert msg.value() == b'{"id":"TM001"}'
+        assert msg.key() == b"TM001"
+        assert msg.headers() == [("content-type", b"json")]
+    finally:
+        await producer.close()
+
+
+async def test_send_uses_codec_header_for_round_trip():
+    producer, fake = make_producer()
+    producer.start()
+    try:
+        msg = await (await producer.send("raw_events", {"id": "TM001", "tags": ["a"]}, codec="msgpack"))
+        assert msg.headers() == [("content-type", b"msgpack")]
+        assert decode_message(msg) == {"id": "TM001", "tags": ["a"]}
+    finally:
+        await producer.close()
+
+
+class FakeConsumer:
+    """Sirve una lista fija de mensajes por lotes y registra los commits."""
+
+    def __init__(self, config, messages):
+        self.config = config
+        self.messages = list(messages)
+        self.committed = {}
+        self.closed = False
+        self.consume_calls = 0
+
+    def subscribe(self, topics):
+        self.topics = topics
+
+    def consume(self, num_messages=1, timeout=-1):
+        self.consume_calls += 1
+        batch, self.messages = self.messages[:num_messages], self.messages[num_messages:]
+        if not batch:
+            threading.Event().wait(timeout)
+        return batch
+
+    def commit(self, offsets=None, asynchronous=True):
+        for tp in offsets:
+            self.committed[(tp.topic, tp.partition)] = tp.offset
+
+    def close(self):
+        self.closed = True
+
+
+def make_consumer(messages, **kwargs):
+    holder = {}
+
+    def factory(config):
+        holder["fake"] = FakeConsumer(config, messages)
+        return holder["fake"]
+
+    kwargs.setdefault("poll_timeout", 0.01)
+    consumer = AsyncKafkaConsumer({"group.id": "test"}, ["raw_events"], consumer_factory=factory, **kwargs)
+    return consumer, holder["fake"]
+
+
+def sample_messages(count, partitions=2):
+    return [FakeMessage("raw_events", str(i).encode(), partition=i % partitions, offset=i // partitions) for i in range(count)]
+
+
+async def test_consumer_yields_batches_and_commits_after_processing():
+    consumer, fake = make_consumer(sample_messages(10), batch_size=4)
+    assert fake.config["enable.auto.commit"] is False
+    await consumer.start()
+    received = []
+    async for batch in consumer:
+        received.extend(m.value() for m in batch)
+        if len(received) == 10:
+            break
+    consumer.commit(batch)
+    await consumer.stop()
+    assert received == [str(i).encode() for i in range(10)]
+    assert fake.committed == {("raw_events", 0): 5, ("raw_events", 1): 5}
+    assert fake.closed
+
+
+async def test_failed_batch_is_not_committed():
+    consumer, fake = make_consumer(sample_messages(4), batch_size=2, max_queued_batches=1)
+    await consumer.start()
+    calls = []
+
+    async def handler(batch):
+        calls.append(batch)
+        if len(calls) == 2:
+            raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await run_consumer(consumer, handler)
+    # Solo el primer lote (offsets 0 de cada partición) quedó confirmado
+    assert fake.committed == {("raw_events", 0): 1, ("raw_events", 1): 1}
+    assert fake.closed
+
+
+async def test_consumer_does_not_block_event_loop():
+    consumer, _ = make_consumer([], poll_timeout=0.5)
+    await consumer.start()
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    await asyncio.wait_for(ticker(), timeout=0.5)
+    await consumer.stop()
+    assert ticks == 10
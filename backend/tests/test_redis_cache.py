@@ -0,0 +1,146 @@
+import asyncio
+
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.adapters.redis_adapter import L1Cache, RedisCache
+
+
+class CountingRedis(fakeredis.FakeAsyncRedis):
+    """Redis local que cuenta los comandos recibidos (para comprobar el enrutado)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = []
+
+    async def execute_command(self, *args, **options):
+        self.commands.append(args[0])
+        return await super().execute_command(*args, **options)
+
+
+class DownRedis(fakeredis.FakeAsyncRedis):
+    async def execute_command(self, *args, **options):
+        raise RedisConnectionError("réplica caída")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_cache(server, **kwargs):
+    master = CountingRedis(server=server)
+    replica = CountingRedis(server=server)
+    return RedisCache(master, replica, **kwargs), master, replica
+
+
+async def test_reads_go_to_replica_and_writes_to_master(server):
+    cache, master, replica = make_cache(server)
+    await cache.set("events:madrid", [{"id": "TM1"}])
+    assert await cache.get("events:madrid") == [{"id": "TM1"}]
+    assert "SET" in master.commands and "GET" not in master.commands
+    assert replica.commands == ["GET"]
+    assert await cache.get("missing", default="x") == "x"
+
+
+async def test_ttl_has_bounded_jitter(server):
+    cache, master, _ = make_cache(server, default_ttl=100, jitter=0.2)
+    ttls = {cache.ttl_with_jitter() for _ in range(200)}
+    assert min(ttls) >= 100 and max(ttls) <= 120 and len(ttls) > 1
+    await cache.set("k", 1)
+    assert 100 <= await master.ttl("cache:k") <= 120
+
+
+async def test_concurrent_misses_are_coalesced_into_one_load(server):
+    cache, _, _ = make_cache(server)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"recommendations": [1, 2, 3]}
+
+    results = await asyncio.gather(*(cache.get_or_load("recs:user-1", loader) for _ in range(50)))
+    assert calls == 1
+    assert all(result == {"recommendations": [1, 2, 3]} for result in results)
+    assert cache.stats["coalesced"] == 49
+    assert await cache.get_or_load("recs:user-1", loader) == {"recommendations": [1, 2, 3]}
+    assert calls == 1
+
+
+async def test_other_replica_waits_for_the_lock_holder(server):
+    first, _, _ = make_cache(server)
+    second, _, _ = make_cache(server)
+    calls = []
+
+    async def loader(name):
+        calls.append(name)
+        await asyncio.sleep(0.1)
+        return name
+
+    results = await asyncio.gather(
+        first.get_or_load("hot", lambda: loader("first")),
+        second.get_or_load("hot", lambda: loader("second")),
+    )
+    assert calls == ["first"]
+    assert results == ["first", "first"]
+
+
+async def test_cancelled_caller_does_not_cancel_shared_load(server):
+    cache, _, _ = make_cache(server)
+
+    async def loader():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    leader = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == "ok"
+
+
+async def test_get_many_uses_one_mget_and_loads_only_missing(server):
+    cache, _, replica = make_cache(server)
+    await cache.set_many({"event:1": {"id": 1}, "event:2": {"id": 2}})
+    loaded_with = []
+
+    async def loader(missing):
+        loaded_with.append(missing)
+        return {key: {"id": int(key.split(":")[1])} for key in missing}
+
+    result = await cache.get_many_or_load(["event:1", "event:2", "event:3"], loader)
+    assert result == {"event:1": {"id": 1}, "event:2": {"id": 2}, "event:3": {"id": 3}}
+    assert loaded_with == [["event:3"]]
+    assert replica.commands == ["MGET"]
+
+
+async def test_l1_serves_hot_keys_without_round_trip(server):
+    cache, _, replica = make_cache(server, l1=L1Cache(max_items=2, ttl=60))
+    await cache.set("a", 1)
+    assert await cache.get("a") == 1
+    assert replica.commands == []
+    assert cache.stats["l1_hits"] == 1
+
+    await cache.delete("a")
+    assert await cache.get("a") is None
+
+
+def test_l1_is_bounded_lru():
+    l1 = L1Cache(max_items=2, ttl=60)
+    l1.set("a", 1)
+    l1.set("b", 2)
+    l1.get("a")
+    l1.set("c", 3)
+    assert len(l1) == 2 and l1.get("a") == 1 and l1.get("c") == 3
+
+
+async def test_replica_failure_falls_back_to_master(server):
+    master = CountingRedis(server=server)
+    cache = RedisCache(master, DownRedis(server=server))
+    await cache.set("k", "v")
+    assert await cache.get("k") == "v"
+    assert await cache.get_or_load("other", lambda: asyncio.sleep(0, result="loaded")) == "loaded"
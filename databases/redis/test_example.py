@@ -20,6 +20,7 @@ sentinel = Sentinel(sentinels_list, socket_connect_timeout=0.5, password=passwor
 # La contraseña se pasa automáticamente a la instancia master_for
 redis_master_client = sentinel.master_for(master_name)
 
-# Obtener el cliente esclavo (opcional, para lecturas)
+# Obtener el cliente esclavo (para lecturas; si no hay réplicas disponibles usa el maestro)
 # La contraseña se pasa automáticamente a la instancia slave_for
-# redis_slave_client = sentinel.slave_for(master_name)
\ No newline at end of file
+# El backend usa el mismo esquema en src/adapters/redis_adapter.py (create_redis_clients)
+redis_slave_client = sentinel.slave_for(master_name)
\ No newline at end of file
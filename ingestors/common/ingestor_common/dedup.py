@@ -0,0 +1,153 @@
+import hashlib
+import json
+import math
+import os
+from typing import Any
+
+from loguru import logger
+
+
+def content_hash(data: Any) -> str:
+    """Hash canónico del contenido (independiente del orden de las claves)."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class BloomFilter:
+    """Filtro de Bloom de tamaño fijo (``capacity`` elementos con ``error_rate`` de falsos positivos)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        """Reserva el array de bits para ``capacity`` elementos."""
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str) -> list[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, value: str) -> None:
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class ContentDeduplicator:
+    """Descarta mensajes cuyo contenido no ha cambiado desde la última publicación.
+
+    La identidad es ``(source_api, query_type, entity id)`` y el valor su hash de
+    contenido. Localmente se usan dos generaciones de filtros de Bloom (memoria
+    acotada: cuando la actual se llena, la anterior se descarta). Con Redis, el
+    último hash de cada identidad se guarda con ``SET ... EX ... GET``, exacto y
+    compartido entre réplicas del ingestor, con el TTL de retención del topic.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+        redis_client: Any = None,
+        redis_ttl: int = 7 * 24 * 60 * 60,
+        redis_prefix: str = "dedup",
+    ) -> None:
+        """Inicializa el deduplicador.
+
+        Args:
+            capacity: Elementos por generación del filtro de Bloom.
+            error_rate: Tasa de falsos positivos (mensajes nuevos descartados por error).
+            redis_client: Cliente Redis opcional para el estado exacto compartido.
+            redis_ttl: Vigencia (s) de cada hash en Redis; por defecto la retención de raw_events.
+            redis_prefix: Prefijo de las claves en Redis.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous: BloomFilter | None = None
+        self.redis = redis_client
+        self.redis_ttl = redis_ttl
+        self.redis_prefix = redis_prefix
+        self.seen = 0
+        self.dropped = 0
+        self.bytes_seen = 0
+        self.bytes_dropped = 0
+
+    @classmethod
+    def from_env(cls) -> "ContentDeduplicator":
+        """Deduplicador según ``DEDUP_CAPACITY`` y, si está definido, ``DEDUP_REDIS_URL``."""
+        redis_client = None
+        redis_url = os.getenv("DEDUP_REDIS_URL")
+        if redis_url:
+            import redis  # dependencia opcional: solo si se comparte estado entre réplicas
+
+            redis_client = redis.Redis.from_url(redis_url)
+        return cls(capacity=int(os.getenv("DEDUP_CAPACITY", "1000000")), redis_client=redis_client)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fracción de mensajes descartados por no haber cambiado."""
+        return self.dropped / self.seen if self.seen else 0.0
+
+    def _remember(self, fingerprint: str) -> None:
+        if self._current.count >= self.capacity:
+            self._previous, self._current = self._current, BloomFilter(self.capacity, self.error_rate)
+        self._current.add(fingerprint)
+
+    def _seen_locally(self, fingerprint: str) -> bool:
+        return fingerprint in self._current or (self._previous is not None and fingerprint in self._previous)
+
+    def filter(self, source_api: str, query_type: str, entries: list[tuple[str | None, str, int]]) -> list[bool]:
+        """Decide qué entradas publicar.
+
+        Args:
+            source_api: Fuente de los mensajes.
+            query_type: Tipo de consulta.
+            entries: ``(entity id, hash de contenido, tamaño en bytes)`` de cada mensaje.
+
+        Returns:
+            Por cada entrada, True si hay que publicarla.
+        """
+        decisions = [True] * len(entries)
+        remote = []
+        for i, (eid, digest, size) in enumerate(entries):
+            self.seen += 1
+            self.bytes_seen += size
+            if eid is None:
+                continue  # sin identidad estable no se puede deduplicar
+            fingerprint = f"{source_api}|{query_type}|{eid}|{digest}"
+            if self._seen_locally(fingerprint):
+                decisions[i] = False
+            elif self.redis is not None:
+                remote.append(i)
+            else:
+                self._remember(fingerprint)
+
+        if remote:
+            pipe = self.redis.pipeline(transaction=False)
+            for i in remote:
+                eid, digest, _ = entries[i]
+                pipe.set(f"{self.redis_prefix}:{source_api}:{query_type}:{eid}", digest, ex=self.redis_ttl, get=True)
+            previous = pipe.execute()
+            for i, old in zip(remote, previous, strict=True):
+                eid, digest, _ = entries[i]
+                if old is not None and (old.decode() if isinstance(old, bytes) else old) == digest:
+                    decisions[i] = False
+                self._remember(f"{source_api}|{query_type}|{eid}|{digest}")
+
+        for decision, (_, _, size) in zip(decisions, entries, strict=True):
+            if not decision:
+                self.dropped += 1
+                self.bytes_dropped += size
+        return decisions
+
+    def log_stats(self) -> None:
+        logger.info(
+            f"Dedup: {self.dropped}/{self.seen} mensajes descartados (hit ratio {self.hit_ratio:.1%}, "
+            f"{self.bytes_dropped / 1024:.0f} KiB de {self.bytes_seen / 1024:.0f} KiB)"
+        )
@@ -0,0 +1,278 @@
+import asyncio
+import json
+import re
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from ingestor_common.kafka_sink import KafkaSink
+from ingestor_common.rate_limiter import RateLimiter, TokenBucket
+from ingestor_common.response_cache import CacheEntry, ResponseCache, cache_key
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def _as_items(payload: Any) -> list:
+    return payload if isinstance(payload, list) else [payload]
+
+
+@dataclass
+class FetchRequest:
+    """Una consulta a una API y cómo publicar su resultado.
+
+    Attributes:
+        url: URL del endpoint.
+        params: Parámetros de query.
+        query_type: Tipo de consulta que viaja en ``metadata.query_type``.
+        topic: Topic de Kafka de destino.
+        method: Método HTTP.
+        json: Cuerpo JSON (p. ej. consultas GraphQL).
+        headers: Cabeceras adicionales de esta petición.
+        extract: Extrae la lista de items a publicar del JSON de la respuesta.
+        next_page: Devuelve la petición de la página siguiente, o None si no hay más.
+        key: Clave de partición de cada item.
+        ttl: Segundos que la respuesta se considera vigente en la caché (None: usar
+            ``Cache-Control: max-age`` o el TTL por defecto del motor).
+    """
+
+    url: str
+    params: dict = field(default_factory=dict)
+    query_type: str = ""
+    topic: str = "raw_events"
+    method: str = "GET"
+    json: dict | None = None
+    headers: dict = field(default_factory=dict)
+    extract: Callable[[Any], list] = _as_items
+    next_page: Callable[["FetchRequest", Any], "FetchRequest | None"] | None = None
+    key: Callable[[dict], str | None] | None = None
+    ttl: float | None = None
+
+    def with_params(self, **params: Any) -> "FetchRequest":
+        """Copia de la petición con parámetros de query actualizados (útil para paginar)."""
+        return replace(self, params={**self.params, **params})
+
+
+class IngestionEngine:
+    """Motor común de ingesta HTTP asíncrona para todos los ingestores.
+
+    - Un único ``httpx.AsyncClient`` con conexiones keep-alive reutilizadas
+      (HTTP/2 cuando el servidor lo soporta).
+    - Concurrencia acotada por un semáforo y limitador de cuota por API.
+    - Las páginas se procesan a medida que llegan y sus items van directos al
+      ``KafkaSink``, sin acumular el resultado completo en memoria.
+    - Con ``cache``, las respuestas vigentes no se vuelven a pedir, las
+      caducadas se revalidan con ``ETag``/``Last-Modified`` y las páginas que
+      no han cambiado no se vuelven a publicar.
+
+    Uso::
+
+        async with IngestionEngine("ticketmaster", sink, limiter) as engine:
+            await engine.run(requests)
+    """
+
+    def __init__(
+        self,
+        source_api: str,
+        sink: KafkaSink,
+        rate_limiter: RateLimiter | TokenBucket | None = None,
+        max_concurrency: int = 10,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        headers: dict | None = None,
+        http2: bool = True,
+        client: httpx.AsyncClient | None = None,
+        cache: ResponseCache | None = None,
+        default_ttl: float = 0.0,
+    ) -> None:
+        """Inicializa el motor.
+
+        Args:
+            source_api: Nombre de la fuente (``metadata.source_api``).
+            sink: Destino de los items obtenidos.
+            rate_limiter: Limitador de cuota de la API.
+            max_concurrency: Máximo de peticiones HTTP en vuelo (y de conexiones del pool).
+            timeout: Timeout por petición, en segundos.
+            max_retries: Reintentos ante 429/5xx o errores de transporte.
+            backoff: Espera base (s) del backoff exponencial entre reintentos.
+            headers: Cabeceras comunes a todas las peticiones.
+            http2: Negociar HTTP/2 cuando el servidor lo permita.
+            client: Cliente HTTP ya construido (por defecto se crea uno).
+            cache: Caché de respuestas (ver ``ResponseCache.from_env``).
+            default_ttl: Vigencia (s) de las respuestas sin TTL propio ni ``max-age``.
+        """
+        self.source_api = source_api
+        self.sink = sink
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._owns_client = client is None
+        self._client = client
+        self._client_options = {
+            "http2": http2,
+            "timeout": timeout,
+            "headers": {"accept": "application/json", **(headers or {})},
+            "limits": httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+                keepalive_expiry=60,
+            ),
+        }
+        self.cache = cache
+        self.default_ttl = default_ttl
+        self.requests_made = 0
+        self.errors = 0
+        self.unchanged_pages = 0
+
+    async def __aenter__(self) -> "IngestionEngine":
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._client_options)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await asyncio.to_thread(self.sink.flush)
+        if getattr(self.sink, "dedup", None) is not None:
+            self.sink.dedup.log_stats()
+
+    async def _request(self, request: FetchRequest, headers: dict) -> httpx.Response:
+        """Hace la petición respetando cuota y concurrencia, con reintentos ante 429/5xx."""
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            try:
+                async with self._semaphore:
+                    self.requests_made += 1
+                    response = await self._client.request(
+                        request.method,
+                        request.url,
+                        params=request.params,
+                        json=request.json,
+                        headers=headers,
+                    )
+                if response.status_code not in RETRYABLE_STATUS:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                error: Exception = httpx.HTTPStatusError(
+                    f"HTTP {response.status_code}", request=response.request, response=response
+                )
+            except httpx.TransportError as e:
+                retry_after, error = None, e
+
+            attempt += 1
+            if attempt > self.max_retries:
+                raise error
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else self.backoff * 2 ** (attempt - 1)
+            logger.warning(f"[{self.source_api}] {error} en {request.url}, reintento {attempt}/{self.max_retries} en {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _expires_at(self, request: FetchRequest, response: httpx.Response) -> float:
+        ttl = request.ttl
+        if ttl is None:
+            max_age = MAX_AGE.search(response.headers.get("Cache-Control", ""))
+            ttl = float(max_age.group(1)) if max_age else self.default_ttl
+        return time.time() + ttl
+
+    async def _fetch(self, request: FetchRequest) -> tuple[Any, bool]:
+        """Devuelve ``(json, changed)``; ``changed`` es False si el contenido ya estaba en caché."""
+        if self.cache is None:
+            response = await self._request(request, request.headers)
+            response.raise_for_status()
+            return response.json(), True
+
+        key = cache_key(request.method, request.url, request.params, request.json)
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh:
+            self.cache.hits += 1
+            return json.loads(entry.body), False
+
+        headers = {**request.headers, **(entry.validators() if entry else {})}
+        response = await self._request(request, headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.revalidated += 1
+            self.cache.touch(key, self._expires_at(request, response))
+            return json.loads(entry.body), False
+        response.raise_for_status()
+        payload = response.json()
+        self.cache.misses += 1
+        changed = entry is None or entry.body != response.content
+        self.cache.put(
+            key,
+            CacheEntry(
+                response.content,
+                self._expires_at(request, response),
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            ),
+        )
+        return payload, changed
+
+    async def fetch(self, request: FetchRequest) -> Any:
+        """Obtiene el JSON de la petición (de la caché si sigue vigente)."""
+        payload, _ = await self._fetch(request)
+        return payload
+
+    async def _pages(self, request: FetchRequest) -> AsyncIterator[tuple[Any, bool]]:
+        current: FetchRequest | None = request
+        while current is not None:
+            payload, changed = await self._fetch(current)
+            yield payload, changed
+            current = current.next_page(current, payload) if current.next_page else None
+
+    async def pages(self, request: FetchRequest) -> AsyncIterator[Any]:
+        """Itera las páginas de una consulta a medida que se descargan."""
+        async for payload, _ in self._pages(request):
+            yield payload
+
+    async def ingest(self, request: FetchRequest) -> int:
+        """Descarga todas las páginas de una consulta y publica sus items. Devuelve cuántos.
+
+        Las páginas sin cambios respecto a la caché no se vuelven a publicar.
+        """
+        published = 0
+        async for payload, changed in self._pages(request):
+            if not changed:
+                self.unchanged_pages += 1
+                continue
+            items = request.extract(payload)
+            if items:
+                count = await self.sink.publish(
+                    request.topic, self.source_api, request.query_type, items, key=request.key
+                )
+                published += count
+        return published
+
+    async def run(self, requests: Iterable[FetchRequest]) -> int:
+        """Ingesta un conjunto de consultas en paralelo (máximo ``max_concurrency`` a la vez).
+
+        Un fallo en una consulta se registra y no detiene al resto.
+        """
+        pending = iter(requests)
+        total = 0
+
+        async def worker() -> None:
+            nonlocal total
+            for request in pending:
+                try:
+                    count = await self.ingest(request)
+                    total += count
+                except (httpx.HTTPError, ValueError) as e:
+                    self.errors += 1
+                    logger.error(f"[{self.source_api}] Fallo ingestando {request.query_type} ({request.url}): {e}")
+
+        await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
+        logger.info(
+            f"[{self.source_api}] {total} items publicados con {self.requests_made} peticiones "
+            f"({self.unchanged_pages} páginas sin cambios, {self.errors} errores)"
+        )
+        return total
@@ -0,0 +1,138 @@
+import asyncio
+import os
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+from typing import Any
+
+from confluent_kafka import Producer
+from loguru import logger
+from loopcity_messaging.keys import KeyStrategy, entity_id, get_key_strategy
+from loopcity_messaging.serialization import Serializer
+
+from ingestor_common.dedup import ContentDeduplicator, content_hash
+
+
+def get_producer_config() -> dict:
+    """Configuración del productor de los ingestores a partir de las variables de entorno."""
+    conf = {
+        "bootstrap.servers": os.getenv("KAFKA_BROKERS", "kafka:9092"),
+        "client.id": os.getenv("KAFKA_CLIENT_ID", "ingestor-app"),
+        "security.protocol": os.getenv("KAFKA_SECURITY_PROTOCOL", "PLAINTEXT"),
+        # Igual que config/kafka_config.yaml: idempotencia + batching
+        "enable.idempotence": True,
+        "acks": "all",
+        "linger.ms": 20,
+        "batch.size": 512 * 1024,
+        "queue.buffering.max.messages": 500000,
+        # Los payloads crudos de las APIs son JSON muy repetitivo: zstd da la mejor ratio
+        "compression.type": os.getenv("KAFKA_COMPRESSION_TYPE", "zstd"),
+    }
+    if conf["security.protocol"] in ["SASL_SSL", "SASL_PLAINTEXT"]:
+        conf["sasl.mechanism"] = os.getenv("KAFKA_SASL_MECHANISM", "SCRAM-SHA-512")
+        conf["sasl.username"] = os.getenv("KAFKA_USERNAME")
+        conf["sasl.password"] = os.getenv("KAFKA_PASSWORD")
+    return conf
+
+
+class KafkaSink:
+    """Publica los resultados de las APIs en Kafka con el sobre ``{"metadata", "data"}``.
+
+    ``metadata`` incluye ``entity_id`` y ``content_hash`` para dar a cada
+    mensaje una identidad estable. Con ``dedup``, los items cuyo contenido no ha
+    cambiado desde la última publicación no se vuelven a producir. El payload se
+    codifica con ``KAFKA_CODEC`` (``msgpack`` por defecto) y el formato viaja en
+    la cabecera ``content-type``. La clave de partición la decide ``key_strategy``
+    (``KAFKA_KEY_STRATEGY``: ``entity``, ``city[:buckets]`` o ``geohash[:precision]``),
+    independiente de la identidad de la entidad.
+    """
+
+    def __init__(
+        self,
+        producer: Producer | None = None,
+        backpressure_wait: float = 0.05,
+        dedup: ContentDeduplicator | None = None,
+        serializer: Serializer | None = None,
+        key_strategy: KeyStrategy | None = None,
+    ) -> None:
+        """Inicializa el sink.
+
+        Args:
+            producer: Productor a usar (por defecto uno nuevo con ``get_producer_config()``).
+            backpressure_wait: Espera (s) entre reintentos cuando la cola local está llena.
+            dedup: Etapa de deduplicación por hash de contenido.
+            serializer: Codec de los mensajes (por defecto el de ``KAFKA_CODEC``).
+            key_strategy: Estrategia de clave de partición (por defecto la de ``KAFKA_KEY_STRATEGY``).
+        """
+        self.producer = producer or Producer(get_producer_config())
+        self.backpressure_wait = backpressure_wait
+        self.dedup = dedup
+        self.serializer = serializer or Serializer(os.getenv("KAFKA_CODEC", "msgpack"))
+        self.key_strategy = key_strategy or get_key_strategy(os.getenv("KAFKA_KEY_STRATEGY", "geohash:5"))
+        self.published = 0
+        self.failed = 0
+
+    def _on_delivery(self, err: Any, msg: Any) -> None:
+        if err is not None:
+            self.failed += 1
+            logger.error(f"Fallo en la entrega a '{msg.topic()}': {err}")
+
+    async def _produce(self, topic: str, key: bytes | None, value: bytes, headers: list) -> None:
+        while True:
+            try:
+                self.producer.produce(topic, key=key, value=value, headers=headers, on_delivery=self._on_delivery)
+                return
+            except BufferError:
+                # Cola local llena: servimos delivery reports y cedemos el event loop
+                self.producer.poll(0)
+                await asyncio.sleep(self.backpressure_wait)
+
+    async def publish(
+        self,
+        topic: str,
+        source_api: str,
+        query_type: str,
+        items: Iterable[dict],
+        key: Callable[[dict], str | None] | None = None,
+    ) -> int:
+        """Publica cada item como un mensaje. Devuelve cuántos se encolaron.
+
+        ``key`` extrae el id de la entidad (identidad para la deduplicación); la
+        clave de partición se calcula a partir de él con ``key_strategy``.
+        """
+        timestamp = datetime.now(timezone.utc).isoformat()
+        messages = []
+        for item in items:
+            eid = entity_id(item, key(item) if key else None)
+            partition_key = self.key_strategy(source_api, item, eid)
+            digest = content_hash(item)
+            envelope = {
+                "metadata": {
+                    "source_api": source_api,
+                    "query_type": query_type,
+                    "timestamp": timestamp,
+                    "entity_id": eid,
+                    "content_hash": digest,
+                },
+                "data": item,
+            }
+            value, headers = self.serializer.serialize(envelope)
+            messages.append((partition_key, eid, digest, value, headers))
+
+        if self.dedup is not None:
+            entries = [(eid, digest, len(value)) for _, eid, digest, value, _ in messages]
+            if self.dedup.redis is not None:
+                # El round-trip a Redis no debe bloquear el event loop
+                keep = await asyncio.to_thread(self.dedup.filter, source_api, query_type, entries)
+            else:
+                keep = self.dedup.filter(source_api, query_type, entries)
+            messages = [message for message, publish in zip(messages, keep, strict=True) if publish]
+
+        for partition_key, _, _, value, headers in messages:
+            await self._produce(topic, partition_key.encode("utf-8") if partition_key is not None else None, value, headers)
+        self.producer.poll(0)
+        self.published += len(messages)
+        return len(messages)
+
+    def flush(self, timeout: float = 30.0) -> int:
+        """Espera a que se entreguen los mensajes pendientes. Devuelve los que quedan."""
+        return self.producer.flush(timeout)
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Token bucket asíncrono para respetar la cuota documentada de una API.
+
+    ``TokenBucket(3000, 60)`` permite 3.000 llamadas por minuto repartidas a
+    ritmo constante; ``burst`` fija cuántas llamadas pueden salir de golpe
+    (por defecto, lo que corresponde a un segundo de cuota, mínimo 1).
+    """
+
+    def __init__(self, calls: float, period: float = 1.0, burst: float | None = None) -> None:
+        """Inicializa el bucket.
+
+        Args:
+            calls: Llamadas permitidas por periodo.
+            period: Duración del periodo en segundos.
+            burst: Capacidad máxima del bucket (ráfaga permitida).
+        """
+        self.rate = calls / period
+        self.capacity = burst if burst is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Espera hasta que haya ``tokens`` disponibles y los consume (orden FIFO)."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+
+class RateLimiter:
+    """Combina varios buckets (p. ej. límite por segundo y por día) de una misma API key."""
+
+    def __init__(self, *buckets: TokenBucket) -> None:
+        """Inicializa el limitador con los buckets que deben respetarse a la vez."""
+        self.buckets = buckets
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Espera a que todos los buckets concedan ``tokens``."""
+        for bucket in self.buckets:
+            await bucket.acquire(tokens)
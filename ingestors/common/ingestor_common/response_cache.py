@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlsplit
+
+from loguru import logger
+
+# Parámetros que identifican la API key de cada fuente: no forman parte de la clave de caché
+SECRET_PARAMS = {"key", "apikey", "api_key", "appid", "token"}
+
+
+def cache_key(method: str, url: str, params: dict | None = None, body: dict | None = None) -> str:
+    """Clave estable de una petición: URL y parámetros normalizados, sin la API key."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k.lower() not in SECRET_PARAMS]
+    query += [(k, str(v)) for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS and v is not None]
+    normalized = {
+        "method": method.upper(),
+        "url": f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path.rstrip('/') or '/'}",
+        "query": sorted(query),
+        "body": body,
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """Respuesta cacheada y sus validadores HTTP."""
+
+    body: bytes
+    expires_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> dict:
+        """Cabeceras para una petición condicional."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Caché de respuestas en disco (SQLite) con expulsión LRU acotada por tamaño.
+
+    Vive en un volumen del contenedor, así que sobrevive a reinicios: tras un
+    redeploy no se vuelve a descargar lo que sigue vigente.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """Abre (o crea) la caché.
+
+        Args:
+            path: Fichero SQLite.
+            max_bytes: Tamaño máximo de los cuerpos almacenados.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body BLOB, size INTEGER, expires_at REAL,"
+            " etag TEXT, last_modified TEXT, last_access REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access)")
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls, source_api: str) -> "ResponseCache":
+        """Caché de un ingestor según ``INGEST_CACHE_DIR`` e ``INGEST_CACHE_MAX_MB``."""
+        cache_dir = os.getenv("INGEST_CACHE_DIR", "/var/cache/loopcity")
+        max_mb = int(os.getenv("INGEST_CACHE_MAX_MB", "256"))
+        return cls(os.path.join(cache_dir, f"{source_api}.sqlite"), max_mb * 1024 * 1024)
+
+    @property
+    def size(self) -> int:
+        """Bytes ocupados por los cuerpos almacenados."""
+        return self._size
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Devuelve la entrada (vigente o no) y la marca como usada recientemente."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, expires_at, etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        return CacheEntry(*row)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Guarda la entrada y expulsa las menos usadas si se supera ``max_bytes``."""
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.body, size, entry.expires_at, entry.etag, entry.last_modified, time.time()),
+            )
+            self._size += size - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def touch(self, key: str, expires_at: float) -> None:
+        """Renueva la vigencia de una entrada tras un 304 Not Modified."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?", (expires_at, time.time(), key)
+            )
+
+    def _evict(self) -> None:
+        evicted = 0
+        while self._size > self.max_bytes:
+            rows = self._db.execute("SELECT key, size FROM responses ORDER BY last_access LIMIT 100").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._size -= size
+                evicted += 1
+                if self._size <= self.max_bytes:
+                    break
+        logger.debug(f"Caché de respuestas: {evicted} entradas expulsadas (LRU)")
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,28 @@
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class City:
+    """Ciudad a ingestar."""
+
+    name: str
+    country: str
+    lat: float
+    lon: float
+
+
+def load_cities() -> list[City]:
+    """Lee las ciudades de ``INGEST_CITIES`` con formato ``Nombre,PAIS,lat,lon;...``."""
+    raw = os.getenv("INGEST_CITIES", "Madrid,ES,40.4167047,-3.7035825")
+    cities = []
+    for entry in raw.split(";"):
+        if not entry.strip():
+            continue
+        name, country, lat, lon = (part.strip() for part in entry.split(","))
+        cities.append(City(name, country, float(lat), float(lon)))
+    return cities
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+class StubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+        self.client_ports = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_next = 0
+        self.delay = 0.0
+        self.pages = 3
+        self.version = 1
+        self.not_modified = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Servidor de pruebas: /events?page=N devuelve páginas al estilo Ticketmaster."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with state.lock:
+            state.requests.append((url.path, query))
+            state.client_ports.add(self.client_address[1])
+            state.in_flight += 1
+            state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            fail = state.fail_next > 0
+            if fail:
+                state.fail_next -= 1
+        try:
+            time.sleep(state.delay)
+            if fail:
+                self._send(429, {"error": "rate limited"}, {"Retry-After": "0"})
+                return
+            page = int(query.get("page", 0))
+            body = {
+                "_embedded": {"events": [{"id": f"{query.get('city', 'x')}-{page}-{i}"} for i in range(2)]},
+                "page": {"number": page, "totalPages": state.pages},
+            }
+            body["version"] = state.version
+            etag = '"' + hashlib.md5(json.dumps(body, sort_keys=True).encode()).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                with state.lock:
+                    state.not_modified += 1
+                self._send(304, None, {"ETag": etag})
+                return
+            self._send(200, body, {"ETag": etag})
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.state = StubState()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class RecordingSink:
+    """Sink en memoria con la misma interfaz que KafkaSink."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def publish(self, topic, source_api, query_type, items, key=None):
+        items = list(items)
+        for item in items:
+            self.messages.append((topic, key(item) if key else None, source_api, query_type, item))
+        return len(items)
+
+    def flush(self, timeout=30.0):
+        return 0
+
+
+@pytest.fixture
+def sink():
+    return RecordingSink()
@@ -0,0 +1,91 @@
+import fakeredis
+from loopcity_messaging.keys import get_key_strategy
+from loopcity_messaging.serialization import deserialize
+
+from ingestor_common.dedup import BloomFilter, ContentDeduplicator, content_hash
+from ingestor_common.kafka_sink import KafkaSink
+
+
+class RecordingProducer:
+    def __init__(self):
+        self.messages = []
+
+    def produce(self, topic, key=None, value=None, headers=None, on_delivery=None):
+        self.messages.append((topic, key, deserialize(value, headers)))
+
+    def poll(self, timeout=0):
+        return 0
+
+    def flush(self, timeout=None):
+        return 0
+
+
+def events(*names):
+    return [{"id": f"TM{i}", "name": name} for i, name in enumerate(names)]
+
+
+def test_content_hash_is_canonical():
+    assert content_hash({"a": 1, "b": [1, 2]}) == content_hash({"b": [1, 2], "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": 2})
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"in-{i}")
+    assert all(f"in-{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"out-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+async def test_unchanged_items_are_not_republished():
+    producer = RecordingProducer()
+    sink = KafkaSink(producer, dedup=ContentDeduplicator(capacity=1000))
+    key = lambda item: item["id"]  # noqa: E731
+
+    assert await sink.publish("raw_events", "ticketmaster", "events_by_city", events("A", "B"), key=key) == 2
+    assert await sink.publish("raw_events", "ticketmaster", "events_by_city", events("A", "B"), key=key) == 0
+    assert await sink.publish("raw_events", "ticketmaster", "events_by_city", events("A", "B2"), key=key) == 1
+
+    metadata = producer.messages[-1][2]["metadata"]
+    assert metadata["entity_id"] == "TM1"
+    assert metadata["content_hash"] == content_hash({"id": "TM1", "name": "B2"})
+    assert sink.dedup.hit_ratio == 3 / 6
+
+
+def test_same_entity_from_another_query_type_is_kept():
+    dedup = ContentDeduplicator(capacity=100)
+    digest = content_hash({"location_id": 1})
+    assert dedup.filter("tripadvisor", "location_details", [("1", digest, 10)]) == [True]
+    assert dedup.filter("tripadvisor", "location_reviews", [("1", digest, 10)]) == [True]
+    assert dedup.filter("tripadvisor", "location_details", [("1", digest, 10)]) == [False]
+
+
+def test_memory_stays_bounded_by_generations():
+    dedup = ContentDeduplicator(capacity=100)
+    for i in range(1000):
+        dedup.filter("src", "q", [(str(i), "h", 1)])
+    assert dedup._current.count <= 100
+    assert len(dedup._current.bits) == len(dedup._previous.bits)
+
+
+def test_redis_state_is_shared_between_replicas():
+    server = fakeredis.FakeServer()
+    replica_a = ContentDeduplicator(capacity=100, redis_client=fakeredis.FakeRedis(server=server))
+    replica_b = ContentDeduplicator(capacity=100, redis_client=fakeredis.FakeRedis(server=server))
+
+    assert replica_a.filter("ticketmaster", "events_by_city", [("TM1", "h1", 10), ("TM2", "h2", 10)]) == [True, True]
+    assert replica_b.filter("ticketmaster", "events_by_city", [("TM1", "h1", 10), ("TM2", "h3", 10)]) == [False, True]
+    assert replica_b.hit_ratio == 0.5
+    ttl = fakeredis.FakeRedis(server=server).ttl("dedup:ticketmaster:events_by_city:TM1")
+    assert 0 < ttl <= 7 * 24 * 60 * 60
+
+
+async def test_partition_key_follows_strategy_and_identity_follows_entity():
+    producer = RecordingProducer()
+    sink = KafkaSink(producer, dedup=ContentDeduplicator(capacity=1000), key_strategy=get_key_strategy("city"))
+    items = [{"id": "TM1", "city": "Madrid"}, {"id": "TM2", "city": "Madrid"}]
+
+    assert await sink.publish("raw_events", "ticketmaster", "events_by_city", items, key=lambda item: item["id"]) == 2
+    assert [key for _, key, _ in producer.messages] == [b"madrid", b"madrid"]
+    assert [value["metadata"]["entity_id"] for _, _, value in producer.messages] == ["TM1", "TM2"]
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from ingestor_common.engine import FetchRequest, IngestionEngine
+from ingestor_common.rate_limiter import TokenBucket
+
+
+def _next_page(request, payload):
+    page = payload["page"]
+    number = page["number"] + 1
+    return request.with_params(page=number) if number < page["totalPages"] else None
+
+
+def events_request(base_url, city):
+    return FetchRequest(
+        f"{base_url}/events",
+        params={"city": city, "page": 0},
+        query_type="events_by_city",
+        extract=lambda payload: payload["_embedded"]["events"],
+        next_page=_next_page,
+        key=lambda item: item["id"],
+    )
+
+
+async def test_paginated_results_are_published_in_order(stub_server, sink):
+    async with IngestionEngine("stub", sink, max_concurrency=2) as engine:
+        total = await engine.run([events_request(stub_server.base_url, "Madrid")])
+    assert total == 6
+    assert [m[1] for m in sink.messages] == [f"Madrid-{p}-{i}" for p in range(3) for i in range(2)]
+    assert {m[0] for m in sink.messages} == {"raw_events"}
+
+
+async def test_connections_are_reused(stub_server, sink):
+    stub_server.state.pages = 10
+    async with IngestionEngine("stub", sink, max_concurrency=1) as engine:
+        await engine.run([events_request(stub_server.base_url, "Madrid")])
+    assert len(stub_server.state.requests) == 10
+    assert len(stub_server.state.client_ports) == 1
+
+
+async def test_concurrency_is_bounded(stub_server, sink):
+    stub_server.state.pages = 1
+    stub_server.state.delay = 0.05
+    cities = [f"city{i}" for i in range(12)]
+    async with IngestionEngine("stub", sink, max_concurrency=3) as engine:
+        await engine.run(events_request(stub_server.base_url, city) for city in cities)
+    assert len(sink.messages) == 24
+    assert stub_server.state.max_in_flight <= 3
+    assert stub_server.state.max_in_flight > 1
+
+
+async def test_rate_limited_responses_are_retried(stub_server, sink):
+    stub_server.state.pages = 1
+    stub_server.state.fail_next = 2
+    async with IngestionEngine("stub", sink, backoff=0.01) as engine:
+        total = await engine.run([events_request(stub_server.base_url, "Madrid")])
+    assert total == 2
+    assert len(stub_server.state.requests) == 3
+
+
+async def test_failed_request_does_not_stop_the_rest(stub_server, sink):
+    stub_server.state.pages = 1
+    stub_server.state.fail_next = 10
+    async with IngestionEngine("stub", sink, max_concurrency=1, max_retries=1, backoff=0.01) as engine:
+        await engine.run([events_request(stub_server.base_url, "A")])
+        stub_server.state.fail_next = 0
+        total = await engine.run([events_request(stub_server.base_url, "B")])
+    assert engine.errors == 1
+    assert total == 2
+
+
+async def test_token_bucket_enforces_rate(stub_server, sink):
+    stub_server.state.pages = 5
+    limiter = TokenBucket(20, 1, burst=1)
+    start = time.monotonic()
+    async with IngestionEngine("stub", sink, limiter) as engine:
+        await engine.run([events_request(stub_server.base_url, "Madrid")])
+    # 5 peticiones con ráfaga 1 a 20/s: al menos 4 esperas de 50ms
+    assert time.monotonic() - start >= 0.19
+
+
+async def test_token_bucket_is_shared_between_tasks():
+    bucket = TokenBucket(100, 1, burst=5)
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(25)))
+    assert time.monotonic() - start >= 0.19
@@ -0,0 +1,77 @@
+import time
+
+from ingestor_common.engine import FetchRequest, IngestionEngine
+from ingestor_common.response_cache import CacheEntry, ResponseCache, cache_key
+
+
+def weather_request(base_url, ttl=None, api_key="secret"):
+    return FetchRequest(
+        f"{base_url}/weather",
+        params={"city": "Madrid", "appid": api_key},
+        query_type="current_weather",
+        topic="raw_weather",
+        extract=lambda payload: payload["_embedded"]["events"],
+        ttl=ttl,
+    )
+
+
+def test_cache_key_ignores_api_key_and_param_order():
+    a = cache_key("GET", "https://API.example.com/v1/events/", {"city": "Madrid", "apikey": "A", "size": 10})
+    b = cache_key("get", "https://api.example.com/v1/events?size=10&apikey=B", {"city": "Madrid"})
+    c = cache_key("GET", "https://api.example.com/v1/events", {"city": "Sevilla", "size": 10})
+    assert a == b
+    assert a != c
+
+
+def test_entries_survive_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path)
+    cache.put("k", CacheEntry(b'{"a": 1}', time.time() + 60, etag='"v1"'))
+    cache.close()
+    reopened = ResponseCache(path)
+    entry = reopened.get("k")
+    assert entry.body == b'{"a": 1}'
+    assert entry.etag == '"v1"'
+    assert entry.fresh
+    assert reopened.size == len(b'{"a": 1}')
+
+
+def test_lru_eviction_keeps_size_bounded(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=250)
+    for i in range(3):
+        cache.put(f"k{i}", CacheEntry(b"x" * 100, time.time() + 60))
+        time.sleep(0.01)
+    assert cache.get("k0") is None  # la menos usada
+    assert cache.size <= 250
+    cache.get("k1")
+    time.sleep(0.01)
+    cache.put("k3", CacheEntry(b"x" * 100, time.time() + 60))
+    assert cache.get("k1") is not None
+    assert cache.get("k2") is None
+
+
+async def test_fresh_entries_are_not_refetched_nor_republished(stub_server, sink, tmp_path):
+    stub_server.state.pages = 1
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    async with IngestionEngine("stub", sink, cache=cache) as engine:
+        await engine.run([weather_request(stub_server.base_url, ttl=600)])
+        await engine.run([weather_request(stub_server.base_url, ttl=600, api_key="other-key")])
+    assert len(stub_server.state.requests) == 1
+    assert len(sink.messages) == 2
+    assert cache.hits == 1
+
+
+async def test_stale_entries_are_revalidated_with_etag(stub_server, sink, tmp_path):
+    stub_server.state.pages = 1
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    async with IngestionEngine("stub", sink, cache=cache) as engine:
+        await engine.run([weather_request(stub_server.base_url, ttl=0)])
+        await engine.run([weather_request(stub_server.base_url, ttl=0)])
+        assert stub_server.state.not_modified == 1
+        assert len(sink.messages) == 2
+
+        stub_server.state.version = 2
+        await engine.run([weather_request(stub_server.base_url, ttl=0)])
+    assert len(stub_server.state.requests) == 3
+    assert len(sink.messages) == 4
+    assert engine.unchanged_pages == 1
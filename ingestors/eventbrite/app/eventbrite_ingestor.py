@@ -0,0 +1,49 @@
+import asyncio
+import os
+from typing import Any
+
+from ingestor_common.dedup import ContentDeduplicator
+from ingestor_common.engine import FetchRequest, IngestionEngine
+from ingestor_common.kafka_sink import KafkaSink
+from ingestor_common.rate_limiter import RateLimiter, TokenBucket
+from ingestor_common.response_cache import ResponseCache
+
+SOURCE_API = "eventbrite"
+BASE_URL = "https://www.eventbriteapi.com/v3"
+API_TOKEN = os.getenv("EVENTBRITE_API_TOKEN", "")
+VENUE_IDS = [v for v in os.getenv("EVENTBRITE_VENUE_IDS", "240095953").split(",") if v]
+
+# Cuota documentada: 2.000 llamadas por hora y 48.000 al día por token
+RATE_LIMIT = RateLimiter(TokenBucket(2000, 60 * 60, burst=10), TokenBucket(48000, 24 * 60 * 60, burst=10))
+
+
+def _next_page(request: FetchRequest, payload: Any) -> FetchRequest | None:
+    pagination = payload.get("pagination", {})
+    if not pagination.get("has_more_items"):
+        return None
+    return request.with_params(continuation=pagination["continuation"])
+
+
+def events_by_venue(venue_id: str) -> FetchRequest:
+    """Eventos próximos de un venue, paginados con el token de continuación."""
+    return FetchRequest(
+        f"{BASE_URL}/venues/{venue_id}/events/",
+        params={"status": "live", "order_by": "start_asc"},
+        query_type="events_by_venue",
+        ttl=15 * 60,
+        topic="raw_events",
+        extract=lambda payload: payload.get("events", []),
+        next_page=_next_page,
+        key=lambda item: item.get("id"),
+    )
+
+
+async def main() -> None:
+    headers = {"Authorization": f"Bearer {API_TOKEN}"}
+    cache = ResponseCache.from_env(SOURCE_API)
+    async with IngestionEngine(SOURCE_API, KafkaSink(dedup=ContentDeduplicator.from_env()), RATE_LIMIT, max_concurrency=5, headers=headers, cache=cache) as engine:
+        await engine.run(events_by_venue(venue_id) for venue_id in VENUE_IDS)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+import asyncio
+import os
+from dataclasses import replace
+from typing import Any
+
+from ingestor_common.dedup import ContentDeduplicator
+from ingestor_common.engine import FetchRequest, IngestionEngine
+from ingestor_common.kafka_sink import KafkaSink
+from ingestor_common.rate_limiter import TokenBucket
+from ingestor_common.response_cache import ResponseCache
+from ingestor_common.settings import City, load_cities
+
+SOURCE_API = "meetup"
+GRAPHQL_URL = "https://api.meetup.com/gql"
+API_TOKEN = os.getenv("MEETUP_API_TOKEN", "")
+PAGE_SIZE = 50
+
+# Cuota documentada: 500 puntos cada 60 segundos (una consulta simple = 1 punto)
+RATE_LIMIT = TokenBucket(500, 60, burst=10)
+
+EVENTS_QUERY = """
+query($filter: SearchConnectionFilter!, $first: Int, $after: String) {
+  keywordSearch(filter: $filter, input: {first: $first, after: $after}) {
+    pageInfo { hasNextPage endCursor }
+    edges { node { result { ... on Event { id title description dateTime eventUrl venue { name lat lng city } } } } }
+  }
+}
+"""
+
+
+def _events(payload: Any) -> list:
+    edges = payload.get("data", {}).get("keywordSearch", {}).get("edges", [])
+    return [edge["node"]["result"] for edge in edges]
+
+
+def _next_page(request: FetchRequest, payload: Any) -> FetchRequest | None:
+    page_info = payload.get("data", {}).get("keywordSearch", {}).get("pageInfo", {})
+    if not page_info.get("hasNextPage"):
+        return None
+    body = {**request.json, "variables": {**request.json["variables"], "after": page_info["endCursor"]}}
+    return replace(request, json=body)
+
+
+def events_near(city: City, radius_miles: int = 15) -> FetchRequest:
+    """Eventos alrededor de una ciudad (consulta GraphQL paginada por cursor)."""
+    return FetchRequest(
+        GRAPHQL_URL,
+        method="POST",
+        json={
+            "query": EVENTS_QUERY,
+            "variables": {
+                "filter": {"query": "", "lat": city.lat, "lon": city.lon, "radius": radius_miles, "source": "EVENTS"},
+                "first": PAGE_SIZE,
+                "after": None,
+            },
+        },
+        query_type="events_near",
+        ttl=15 * 60,
+        topic="raw_events",
+        extract=_events,
+        next_page=_next_page,
+        key=lambda item: item.get("id"),
+    )
+
+
+async def main() -> None:
+    headers = {"Authorization": f"Bearer {API_TOKEN}"}
+    cache = ResponseCache.from_env(SOURCE_API)
+    async with IngestionEngine(SOURCE_API, KafkaSink(dedup=ContentDeduplicator.from_env()), RATE_LIMIT, max_concurrency=5, headers=headers, cache=cache) as engine:
+        await engine.run(events_near(city) for city in load_cities())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+import asyncio
+import os
+
+from ingestor_common.dedup import ContentDeduplicator
+from ingestor_common.engine import FetchRequest, IngestionEngine
+from ingestor_common.kafka_sink import KafkaSink
+from ingestor_common.rate_limiter import RateLimiter, TokenBucket
+from ingestor_common.response_cache import ResponseCache
+from ingestor_common.settings import City, load_cities
+from loopcity_messaging.keys import get_key_strategy
+
+SOURCE_API = "openweather"
+BASE_URL = "https://api.openweathermap.org/data/2.5"
+API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
+
+# Cuota documentada: 3.000 llamadas/minuto y 100.000.000 al mes
+RATE_LIMIT = RateLimiter(TokenBucket(3000, 60), TokenBucket(100_000_000, 30 * 24 * 60 * 60, burst=50))
+
+
+def _with_city(city: City):  # noqa: ANN202
+    # Añadimos la ciudad consultada al payload para poder particionar y unir por ciudad
+    return lambda payload: [{**payload, "query_city": city.name}]
+
+
+def current_weather(city: City) -> FetchRequest:
+    """Tiempo actual (se actualiza cada 10 minutos)."""
+    return FetchRequest(
+        f"{BASE_URL}/weather",
+        params={"lat": city.lat, "lon": city.lon, "units": "metric", "lang": "es", "appid": API_KEY},
+        query_type="current_weather",
+        ttl=10 * 60,  # el tiempo actual se actualiza cada 10 minutos
+        topic="raw_weather",
+        extract=_with_city(city),
+        key=lambda item: item["query_city"],
+    )
+
+
+def daily_forecast(city: City, days: int = 7) -> FetchRequest:
+    """Previsión diaria de los próximos ``days`` días."""
+    return FetchRequest(
+        f"{BASE_URL}/forecast/daily",
+        params={"lat": city.lat, "lon": city.lon, "cnt": days, "units": "metric", "lang": "es", "appid": API_KEY},
+        query_type="daily_forecast",
+        ttl=3 * 60 * 60,
+        topic="raw_weather",
+        extract=_with_city(city),
+        key=lambda item: item["query_city"],
+    )
+
+
+async def main() -> None:
+    cities = load_cities()
+    requests = [current_weather(city) for city in cities] + [daily_forecast(city) for city in cities]
+    cache = ResponseCache.from_env(SOURCE_API)
+    # raw_weather se particiona por ciudad (igual que en config/topics.yaml)
+    sink = KafkaSink(dedup=ContentDeduplicator.from_env(), key_strategy=get_key_strategy("city"))
+    async with IngestionEngine(SOURCE_API, sink, RATE_LIMIT, max_concurrency=20, cache=cache) as engine:
+        await engine.run(requests)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
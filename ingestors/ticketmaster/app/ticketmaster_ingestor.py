@@ -0,0 +1,52 @@
+import asyncio
+import os
+from typing import Any
+
+from ingestor_common.dedup import ContentDeduplicator
+from ingestor_common.engine import FetchRequest, IngestionEngine
+from ingestor_common.kafka_sink import KafkaSink
+from ingestor_common.rate_limiter import RateLimiter, TokenBucket
+from ingestor_common.response_cache import ResponseCache
+from ingestor_common.settings import City, load_cities
+
+SOURCE_API = "ticketmaster"
+BASE_URL = "https://app.ticketmaster.com/discovery/v2"
+API_KEY = os.getenv("TICKETMASTER_API_KEY", "")
+PAGE_SIZE = 200
+# La Discovery API no devuelve más allá del item 1000 (size * page < 1000)
+MAX_DEEP_PAGING = 1000
+
+# Cuota documentada: 5000 peticiones al día y 5 por segundo
+RATE_LIMIT = RateLimiter(TokenBucket(5, 1), TokenBucket(5000, 24 * 60 * 60, burst=5))
+
+
+def _next_page(request: FetchRequest, payload: Any) -> FetchRequest | None:
+    page = payload.get("page", {})
+    number = page.get("number", 0) + 1
+    if number >= page.get("totalPages", 0) or (number + 1) * PAGE_SIZE > MAX_DEEP_PAGING:
+        return None
+    return request.with_params(page=number)
+
+
+def events_by_city(city: City) -> FetchRequest:
+    """Eventos de una ciudad, paginados."""
+    return FetchRequest(
+        f"{BASE_URL}/events.json",
+        params={"apikey": API_KEY, "city": city.name, "countryCode": city.country, "size": PAGE_SIZE, "page": 0},
+        query_type="events_by_city",
+        ttl=15 * 60,
+        topic="raw_events",
+        extract=lambda payload: payload.get("_embedded", {}).get("events", []),
+        next_page=_next_page,
+        key=lambda item: item.get("id"),
+    )
+
+
+async def main() -> None:
+    cache = ResponseCache.from_env(SOURCE_API)
+    async with IngestionEngine(SOURCE_API, KafkaSink(dedup=ContentDeduplicator.from_env()), RATE_LIMIT, max_concurrency=5, cache=cache) as engine:
+        await engine.run(events_by_city(city) for city in load_cities())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,33 +1,90 @@
-import requests
-
-
-### Location Search
-url = "https://api.content.tripadvisor.com/api/v1/location/search?key=CB94764D7AA2439988928C819D12845A&searchQuery=madrid&category=restaurants&latLong=40.4167047%2C-3.7035825&radius=20&radiusUnit=km&language=es"
-
-headers = {"accept": "application/json"}
-
-response = requests.get(url, headers=headers)
-
-print(response.text)
-
-
-
-### Location Details
-url = "https://api.content.tripadvisor.com/api/v1/location/2086925/details?key=CB94764D7AA2439988928C819D12845A&language=es&currency=EUR"
-
-headers = {"accept": "application/json"}
-
-response = requests.get(url, headers=headers)
-
-print(response.text)
-
-
-
-
-url = "https://api.content.tripadvisor.com/api/v1/location/2086925/reviews?key=2086925&key=CB94764D7AA2439988928C819D12845A&language=es&limit=10"
-
-headers = {"accept": "application/json"}
-
-response = requests.get(url, headers=headers)
-
-print(response.text)
\ No newline at end of file
+import asyncio
+import os
+
+from loguru import logger
+
+from ingestor_common.dedup import ContentDeduplicator
+from ingestor_common.engine import FetchRequest, IngestionEngine
+from ingestor_common.kafka_sink import KafkaSink
+from ingestor_common.rate_limiter import TokenBucket
+from ingestor_common.response_cache import ResponseCache
+from ingestor_common.settings import City, load_cities
+
+SOURCE_API = "tripadvisor"
+BASE_URL = "https://api.content.tripadvisor.com/api/v1"
+API_KEY = os.getenv("TRIPADVISOR_API_KEY", "")
+CATEGORIES = os.getenv("TRIPADVISOR_CATEGORIES", "restaurants,attractions").split(",")
+
+# Cuota documentada: hasta 50 llamadas por segundo
+RATE_LIMIT = TokenBucket(50, 1)
+
+
+def location_search(city: City, category: str) -> FetchRequest:
+    """Búsqueda de lugares de una categoría alrededor del centro de la ciudad."""
+    return FetchRequest(
+        f"{BASE_URL}/location/search",
+        params={
+            "key": API_KEY,
+            "searchQuery": city.name.lower(),
+            "category": category,
+            "latLong": f"{city.lat},{city.lon}",
+            "radius": 20,
+            "radiusUnit": "km",
+            "language": "es",
+        },
+        query_type="location_search",
+        ttl=24 * 60 * 60,  # los resultados de búsqueda apenas cambian
+        topic="raw_places",
+        extract=lambda payload: payload.get("data", []),
+        key=lambda item: str(item.get("location_id")),
+    )
+
+
+def location_details(location_id: str) -> FetchRequest:
+    """Detalle (descripción, precio, categoría...) de un lugar."""
+    return FetchRequest(
+        f"{BASE_URL}/location/{location_id}/details",
+        params={"key": API_KEY, "language": "es", "currency": "EUR"},
+        query_type="location_details",
+        ttl=7 * 24 * 60 * 60,  # la información básica de un lugar cambia muy raramente
+        topic="raw_places",
+        key=lambda item: str(item.get("location_id")),
+    )
+
+
+def location_reviews(location_id: str) -> FetchRequest:
+    """Últimos comentarios de un lugar."""
+    return FetchRequest(
+        f"{BASE_URL}/location/{location_id}/reviews",
+        params={"key": API_KEY, "language": "es", "limit": 10},
+        query_type="location_reviews",
+        ttl=24 * 60 * 60,
+        topic="raw_places",
+        extract=lambda payload: payload.get("data", []),
+        key=lambda item: str(item.get("location_id")),
+    )
+
+
+async def ingest(engine: IngestionEngine, cities: list[City]) -> int:
+    """Busca lugares por ciudad/categoría y descarga en paralelo su detalle y comentarios."""
+    searches = [location_search(city, category) for city in cities for category in CATEGORIES]
+    location_ids: set[str] = set()
+
+    async def search(request: FetchRequest) -> None:
+        payload = await engine.fetch(request)
+        location_ids.update(str(place["location_id"]) for place in payload.get("data", []))
+
+    await asyncio.gather(*(search(request) for request in searches))
+    logger.info(f"[{SOURCE_API}] {len(location_ids)} lugares encontrados")
+    requests = [location_details(lid) for lid in location_ids] + [location_reviews(lid) for lid in location_ids]
+    return await engine.run(requests)
+
+
+async def main() -> None:
+    cache = ResponseCache.from_env(SOURCE_API)
+    async with IngestionEngine(SOURCE_API, KafkaSink(dedup=ContentDeduplicator.from_env()), RATE_LIMIT, max_concurrency=20, cache=cache) as engine:
+        await ingest(engine, load_cities())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
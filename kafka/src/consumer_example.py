@@ -1,17 +1,27 @@
 import os
-import json
-import time
-from confluent_kafka import Consumer, KafkaException, KafkaError
 from src.kafka_manager import KafkaManager # Asegúrate de que esta ruta sea correcta
+from src.worker import BatchWorker
 import logging
 import sys
 
 # Configuración de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def process_records(records):
+    """
+    Handler de ejemplo: recibe los mensajes de un carril (misma partición y, si hay key,
+    mismo grupo de keys) en orden. Aquí se procesaría cada mensaje; se loguea en DEBUG
+    para no pagar tres líneas INFO por mensaje.
+    """
+    for record in records:
+        payload = record.payload()
+        logging.debug(f"'{record.topic}' [partición {record.partition}] @ offset {record.offset}: "
+                      f"key={record.key.decode('utf-8') if record.key else 'N/A'} value={payload}")
+
+
 def run_consumer(group_id, topics):
     """
-    Ejecuta un consumidor de Kafka.
+    Ejecuta un worker de consumo por lotes (ver src/worker.py).
     :param group_id: ID del grupo de consumidores.
     :param topics: Lista de topics a los que suscribirse.
     """
@@ -22,45 +32,18 @@ def run_consumer(group_id, topics):
 
     try:
         kafka_manager = KafkaManager(env=os.environ['KAFKA_ENV']) # Aseguramos que KafkaManager sepa el ambiente
-        
-        # Obtener la configuración del consumidor del KafkaManager
-        consumer_conf = kafka_manager.get_consumer_config(group_id=group_id)
-        consumer = Consumer(consumer_conf)
-        
-        logging.info(f"Consumidor de Kafka inicializado para {kafka_manager.env} con brokers: {consumer_conf['bootstrap.servers']}")
-        logging.info(f"Grupo de consumidor: {group_id}")
-        logging.info(f"Subscribiéndose a topics: {topics}")
-
-        # Suscribirse a los topics
-        consumer.subscribe(topics)
-
-        # Bucle de consumo
-        try:
-            while True:
-                msg = consumer.poll(timeout=1.0) # Espera un mensaje por 1 segundo
-
-                if msg is None:
-                    continue
-                if msg.error():
-                    if msg.error().code() == KafkaError.PARTITION_EOF:
-                        # Fin de la partición (no es un error real, solo indica que no hay más mensajes por ahora)
-                        logging.info(f"%% End of partition reached {msg.topic()} [{msg.partition()}] at offset {msg.offset()}")
-                    elif msg.error().code() == KafkaError.UNKNOWN_TOPIC_OR_PART:
-                        logging.error(f"Error de Kafka: Topic o partición desconocida: {msg.error()}")
-                    elif msg.error():
-                        logging.error(f"Error de consumidor: {msg.error()}")
-                else:
-                    # Mensaje válido recibido
-                    logging.info(f"Recibido mensaje de topic '{msg.topic()}' [partición {msg.partition()}] @ offset {msg.offset()}:")
-                    logging.info(f"  Key: {msg.key().decode('utf-8') if msg.key() else 'N/A'}")
-                    logging.info(f"  Value: {msg.value().decode('utf-8')}")
 
-        except KeyboardInterrupt:
-            logging.info("Interrupción por usuario. Deteniendo consumidor.")
-        finally:
-            # Cerrar limpiamente el consumidor
-            consumer.close()
-            logging.info("Consumidor cerrado.")
+        worker = BatchWorker(
+            group_id,
+            topics,
+            process_records,
+            kafka_manager=kafka_manager,
+            batch_size=int(os.getenv("KAFKA_CONSUMER_BATCH_SIZE", "500")),
+            max_workers=int(os.getenv("KAFKA_CONSUMER_WORKERS", str(os.cpu_count() or 1))),
+            use_processes=os.getenv("KAFKA_CONSUMER_USE_PROCESSES", "false").lower() == "true",
+        )
+        logging.info(f"Worker de Kafka inicializado para {kafka_manager.env}, grupo: {group_id}")
+        worker.run()
 
     except Exception as e:
         logging.critical(f"Fallo crítico al iniciar o usar el consumidor: {e}")
@@ -5,6 +5,8 @@ from datetime import datetime
 from confluent_kafka.admin import AdminClient, NewTopic, ConfigResource, ConfigSource
 from confluent_kafka import KafkaException, KafkaError
 from confluent_kafka import Producer, Consumer # Importar para los getters de config
+from loopcity_messaging.keys import get_key_strategy
+from loopcity_messaging.serialization import Serializer
 import logging
 import sys # Para leer argumentos de la línea de comandos
 
@@ -188,8 +190,12 @@ class KafkaManager:
         logging.error(f"Fallo al crear o verificar topics después de {self.config['max_retries_create_topics']} intentos.")
         raise RuntimeError("No se pudieron crear/verificar todos los topics requeridos.")
 
-    def get_producer_config(self):
-        """Devuelve la configuración completa para un KafkaProducer, incluyendo la idempotencia."""
+    def get_producer_config(self, topic=None):
+        """
+        Devuelve la configuración completa para un KafkaProducer, incluyendo la idempotencia.
+        :param topic: Si se indica, se aplican las propiedades de su sección `producer` en
+                      topics.yaml (p. ej. compression.type) sobre las del ambiente.
+        """
         conf = {
             'bootstrap.servers': self.config['brokers'],
             'client.id': self.config['client_id'],
@@ -198,6 +204,9 @@ class KafkaManager:
         # Añadir propiedades del productor (incluyendo idempotencia)
         producer_props = self.config.get('producer_properties', {})
         conf.update(producer_props)
+        if topic:
+            topic_producer = self.topic_definitions.get(topic, {}).get('producer', {})
+            conf.update({k: v for k, v in topic_producer.items() if k != 'codec'})
 
         # Añadir configuraciones de seguridad adicionales si existen
         if conf['security.protocol'] == 'SSL':
@@ -215,6 +224,15 @@ class KafkaManager:
                 conf['ssl.key.location'] = self.config['ssl_key.location']
         return conf
 
+    def get_serializer(self, topic):
+        """Devuelve el Serializer del codec configurado para el topic (JSON si no hay ninguno)."""
+        topic_producer = self.topic_definitions.get(topic, {}).get('producer', {})
+        return Serializer(topic_producer.get('codec', 'json'), topic_producer.get('schema'))
+
+    def get_key_strategy(self, topic):
+        """Devuelve la estrategia de clave de partición del topic (sección `key` de topics.yaml)."""
+        return get_key_strategy(self.topic_definitions.get(topic, {}).get('key'))
+
     def get_consumer_config(self, group_id):
         """Devuelve la configuración necesaria para un KafkaConsumer."""
         conf = {
@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from collections import Counter, defaultdict
+
+from confluent_kafka import Consumer, KafkaError, TopicPartition
+from loopcity_messaging.keys import entity_id, get_key_strategy, partition_for
+from loopcity_messaging.serialization import deserialize
+from src.kafka_manager import KafkaManager
+
+# Configuración de logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Por encima de este factor (máximo / media) se considera que hay una partición caliente
+SKEW_WARNING = 1.5
+
+
+def skew_factor(values):
+    """
+    Desbalanceo de una distribución: valor máximo entre la media (1.0 = reparto perfecto).
+    :param values: Cantidades por partición.
+    """
+    values = list(values)
+    if not values or not sum(values):
+        return 1.0
+    return max(values) / (sum(values) / len(values))
+
+
+def sample_partitions(consumer, topic, sample_size, timeout=10.0):
+    """
+    Lee los últimos `sample_size` mensajes de cada partición (sin unirse a un grupo ni confirmar offsets).
+    :return: (watermarks {partición: (low, high)}, muestras {partición: [mensajes]})
+    """
+    metadata = consumer.list_topics(topic, timeout=timeout)
+    if topic not in metadata.topics or metadata.topics[topic].error is not None:
+        raise ValueError(f"Topic '{topic}' no encontrado")
+    partitions = sorted(metadata.topics[topic].partitions)
+
+    watermarks = {}
+    assignment = []
+    for partition in partitions:
+        low, high = consumer.get_watermark_offsets(TopicPartition(topic, partition), timeout=timeout)
+        watermarks[partition] = (low, high)
+        if high > low and sample_size > 0:
+            assignment.append(TopicPartition(topic, partition, max(low, high - sample_size)))
+
+    samples = defaultdict(list)
+    if not assignment:
+        return watermarks, samples
+    consumer.assign(assignment)
+    pending = {tp.partition for tp in assignment}
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        for msg in consumer.consume(num_messages=1000, timeout=1.0):
+            if msg.error():
+                if msg.error().code() != KafkaError._PARTITION_EOF:
+                    logging.warning(f"Error leyendo la muestra: {msg.error()}")
+                continue
+            samples[msg.partition()].append(msg)
+            if msg.offset() >= watermarks[msg.partition()][1] - 1:
+                pending.discard(msg.partition())
+    if pending:
+        logging.warning(f"Muestra incompleta en las particiones {sorted(pending)} tras {timeout}s")
+    consumer.unassign()
+    return watermarks, samples
+
+
+def build_report(watermarks, samples, simulate=None):
+    """
+    Calcula mensajes, bytes estimados y claves por partición.
+    Los bytes se estiman con el tamaño medio de la muestra de cada partición.
+    :param simulate: Estrategia de clave (loopcity_messaging.keys) con la que re-particionar
+                     la muestra para prever el reparto antes de cambiar de estrategia.
+    """
+    rows = []
+    simulated = Counter()
+    num_partitions = len(watermarks)
+    for partition, (low, high) in sorted(watermarks.items()):
+        messages = high - low
+        sample = samples.get(partition, [])
+        sizes = [len(msg.value() or b"") + len(msg.key() or b"") for msg in sample]
+        avg_size = sum(sizes) / len(sizes) if sizes else 0
+        keys = Counter(msg.key() for msg in sample)
+        top_key, top_count = keys.most_common(1)[0] if keys else (None, 0)
+        rows.append({
+            "partition": partition,
+            "messages": messages,
+            "bytes": messages * avg_size,
+            "sampled": len(sample),
+            "distinct_keys": len(keys),
+            "unkeyed": keys.get(None, 0),
+            "top_key": top_key.decode("utf-8", "replace") if top_key else None,
+            "top_key_share": top_count / len(sample) if sample else 0.0,
+        })
+        if simulate is not None and sample:
+            # Cada mensaje de la muestra representa messages / len(sample) mensajes de su partición
+            weight = messages / len(sample)
+            for msg in sample:
+                envelope = deserialize(msg.value(), msg.headers()) or {}
+                data = envelope.get("data", envelope) if isinstance(envelope, dict) else {}
+                source_api = envelope.get("metadata", {}).get("source_api", "") if isinstance(envelope, dict) else ""
+                key = simulate(source_api, data, entity_id(data)) if isinstance(data, dict) else None
+                target = partition_for(key.encode("utf-8"), num_partitions) if key is not None else partition
+                simulated[target] += weight
+    return rows, ([simulated.get(p, 0) for p in sorted(watermarks)] if simulate is not None else None)
+
+
+def print_report(topic, rows, simulated=None):
+    total_messages = sum(row["messages"] for row in rows) or 1
+    total_bytes = sum(row["bytes"] for row in rows) or 1
+    print(f"\nTopic '{topic}': {len(rows)} particiones, {total_messages} mensajes retenidos")
+    print(f"{'part':>4} {'mensajes':>10} {'%msg':>6} {'MiB est.':>9} {'%bytes':>7} {'muestra':>8} {'claves':>7} {'sin key':>8}  clave más frecuente")
+    for row in rows:
+        top = f"{row['top_key']} ({row['top_key_share']:.0%})" if row["top_key"] else "-"
+        print(f"{row['partition']:>4} {row['messages']:>10} {row['messages'] / total_messages:>6.1%} "
+              f"{row['bytes'] / 1024 / 1024:>9.1f} {row['bytes'] / total_bytes:>7.1%} {row['sampled']:>8} "
+              f"{row['distinct_keys']:>7} {row['unkeyed']:>8}  {top}")
+
+    message_skew = skew_factor(row["messages"] for row in rows)
+    byte_skew = skew_factor(row["bytes"] for row in rows)
+    print(f"Skew (máximo / media): mensajes {message_skew:.2f}, bytes {byte_skew:.2f}")
+    if max(message_skew, byte_skew) > SKEW_WARNING:
+        hottest = max(rows, key=lambda row: row["bytes"])
+        print(f"AVISO: partición caliente {hottest['partition']} (clave más frecuente: {hottest['top_key']})")
+    if simulated is not None:
+        total = sum(simulated) or 1
+        print("Reparto previsto con la estrategia simulada: " + ", ".join(f"{p}: {count / total:.1%}" for p, count in enumerate(simulated)))
+        print(f"Skew previsto: {skew_factor(simulated):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Informe de desbalanceo (mensajes y bytes) por partición de un topic.")
+    parser.add_argument("topics", nargs="*", default=["raw_events", "raw_places", "raw_weather"])
+    parser.add_argument("--env", default=os.getenv("KAFKA_ENV", "development"))
+    parser.add_argument("--sample", type=int, default=1000, help="Mensajes a muestrear por partición (0 = solo offsets)")
+    parser.add_argument("--simulate", help="Estrategia de clave a simular sobre la muestra (p. ej. geohash:5, city:4, entity)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    kafka_manager = KafkaManager(env=args.env)
+    consumer_conf = kafka_manager.get_consumer_config(group_id="partition-skew-report")
+    consumer_conf['enable.auto.commit'] = False
+    consumer_conf['enable.partition.eof'] = False
+    consumer = Consumer(consumer_conf)
+    simulate = get_key_strategy(args.simulate) if args.simulate else None
+    try:
+        for topic in args.topics:
+            watermarks, samples = sample_partitions(consumer, topic, args.sample, timeout=args.timeout)
+            rows, simulated = build_report(watermarks, samples, simulate)
+            print_report(topic, rows, simulated)
+    except Exception as e:
+        logging.critical(f"Error generando el informe de particiones: {e}")
+        sys.exit(1)
+    finally:
+        consumer.close()
+
+
+if __name__ == "__main__":
+    main()
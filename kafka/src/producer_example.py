@@ -1,7 +1,8 @@
 import os
-import json
 import time
+from datetime import datetime
 from confluent_kafka import Producer
+from loopcity_messaging.keys import entity_id
 from src.kafka_manager import KafkaManager
 import logging
 import sys
@@ -25,10 +26,17 @@ def run_producer():
     try:
         kafka_manager = KafkaManager(env=os.environ['KAFKA_ENV']) # Aseguramos que KafkaManager sepa el ambiente
         
-        producer_conf = kafka_manager.get_producer_config()
-        producer = Producer(producer_conf)
-        logging.info(f"Productor de Kafka inicializado para {kafka_manager.env} con brokers: {producer_conf['bootstrap.servers']}")
-        logging.info(f"Configuración de idempotencia: enable.idempotence={producer_conf.get('enable.idempotence')}, acks={producer_conf.get('acks')}, retries={producer_conf.get('retries')}")
+        # Un productor por topic: la compresión (compression.type) se configura por topic en
+        # topics.yaml y en librdkafka es una propiedad del productor.
+        producers = {}
+
+        def get_producer(topic):
+            if topic not in producers:
+                producer_conf = kafka_manager.get_producer_config(topic)
+                producers[topic] = (Producer(producer_conf), kafka_manager.get_serializer(topic), kafka_manager.get_key_strategy(topic))
+                logging.info(f"Productor de Kafka para '{topic}' inicializado en {kafka_manager.env} con brokers: {producer_conf['bootstrap.servers']}, "
+                             f"compresión: {producer_conf.get('compression.type')}, codec: {producers[topic][1].codec.name}, clave: {producers[topic][2].name}")
+            return producers[topic]
 
         messages_to_send = [
             {"metadata": {"source_api": "ticketmaster", "query_type": "events_by_city", "timestamp": str(datetime.now())}, "data": {"id": "TM001", "name": "Concierto A"}},
@@ -40,15 +48,19 @@ def run_producer():
             # Lógica para determinar el topic basada en la estructura de datos
             if msg_data["metadata"]["source_api"] == "openweather":
                 topic = "raw_weather"
-            elif msg_data["metadata"]["source_type"] == "places": # Ejemplo para un futuro mensaje de lugares
+            elif msg_data["metadata"].get("source_type") == "places": # Ejemplo para un futuro mensaje de lugares
                 topic = "raw_places"
             else: # Por defecto a eventos
                 topic = "raw_events" 
             
-            key = f"message_{i}-{int(time.time())}" # Clave para asegurar buena distribución en particiones
-
+            producer, serializer, key_strategy = get_producer(topic)
+            # Clave según la estrategia del topic (ciudad / geohash / entidad): los mensajes
+            # de una misma zona van a la misma partición y conservan su orden
+            data = msg_data["data"]
+            key = key_strategy(msg_data["metadata"]["source_api"], data, entity_id(data))
+            value, headers = serializer.serialize(msg_data)
             try:
-                producer.produce(topic, key=key.encode('utf-8'), value=json.dumps(msg_data).encode('utf-8'), callback=delivery_report)
+                producer.produce(topic, key=key.encode('utf-8') if key is not None else None, value=value, headers=headers, callback=delivery_report)
                 producer.poll(0) 
                 time.sleep(0.5) # Pausa entre mensajes para simular tráfico real
             except BufferError:
@@ -57,8 +69,9 @@ def run_producer():
             except Exception as e:
                 logging.error(f"Error al producir mensaje: {e}")
 
-        logging.info("Flushing productor... esperando entrega de mensajes pendientes.")
-        producer.flush(30)
+        logging.info("Flushing productores... esperando entrega de mensajes pendientes.")
+        for producer, *_ in producers.values():
+            producer.flush(30)
         logging.info("Productor finalizado.")
 
     except Exception as e:
@@ -0,0 +1,201 @@
+import os
+import sys
+import time
+import zlib
+import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple, Optional
+
+from confluent_kafka import Consumer, KafkaError, KafkaException, TopicPartition
+from loopcity_messaging.serialization import deserialize
+from src.kafka_manager import KafkaManager
+
+# Configuración de logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class Record(NamedTuple):
+    """Copia ligera (y serializable con pickle) de un mensaje de Kafka para los handlers."""
+    topic: str
+    partition: int
+    offset: int
+    key: Optional[bytes]
+    value: Optional[bytes]
+    headers: Optional[list]
+    timestamp: int
+
+    def payload(self):
+        """Payload decodificado según su cabecera content-type (json, msgpack, avro)."""
+        return deserialize(self.value, self.headers)
+
+
+def _to_record(msg):
+    return Record(msg.topic(), msg.partition(), msg.offset(), msg.key(), msg.value(), msg.headers(), msg.timestamp()[1])
+
+
+def _lane(record, lanes):
+    """
+    Carril de ejecución de un mensaje dentro de su partición.
+    Mismo key -> mismo carril, así se conserva el orden por key aunque una partición
+    se reparta entre varios workers. Los mensajes sin key van todos al carril 0.
+    """
+    if lanes <= 1 or record.key is None:
+        return 0
+    return zlib.crc32(record.key) % lanes
+
+
+def _run_lane(handler, records):
+    """Ejecuta el handler sobre los mensajes de un carril, en orden."""
+    handler(records)
+    return len(records)
+
+
+class BatchWorker:
+    """
+    Runtime de consumo por lotes con procesamiento en paralelo.
+
+    - consume(num_messages=N) en vez de poll() mensaje a mensaje.
+    - Cada lote se divide por (topic, partición, carril de key) y cada grupo se
+      envía a un pool de hilos o de procesos, conservando el orden por key.
+    - Mientras el pool procesa el lote N se consume el lote N+1; el lote N se
+      drena y se confirma (commit manual) antes de despachar el siguiente.
+    - En un rebalanceo, on_revoke espera al trabajo en curso y confirma sus
+      offsets de forma síncrona antes de ceder las particiones.
+    """
+
+    def __init__(self, group_id, topics, handler: Callable[[list], None], kafka_manager=None,
+                 batch_size=500, poll_timeout=1.0, max_workers=None, use_processes=False,
+                 lanes_per_partition=None, consumer_factory=Consumer):
+        """
+        :param group_id: ID del grupo de consumidores.
+        :param topics: Lista de topics a los que suscribirse.
+        :param handler: Función que recibe una lista de Record de un mismo carril.
+                        Con use_processes=True debe ser una función de módulo (pickleable).
+        :param kafka_manager: KafkaManager ya inicializado (por defecto se crea uno).
+        :param batch_size: Máximo de mensajes por llamada a consume().
+        :param poll_timeout: Espera máxima de cada consume(), en segundos.
+        :param max_workers: Tamaño del pool (por defecto, número de CPUs).
+        :param use_processes: Usar procesos en vez de hilos (handlers intensivos en CPU).
+        :param lanes_per_partition: Carriles por partición (por defecto, max_workers).
+        """
+        self.kafka_manager = kafka_manager or KafkaManager()
+        self.topics = topics
+        self.handler = handler
+        self.batch_size = batch_size
+        self.poll_timeout = poll_timeout
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.lanes = lanes_per_partition or self.max_workers
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.executor = executor_cls(max_workers=self.max_workers)
+
+        consumer_conf = self.kafka_manager.get_consumer_config(group_id=group_id)
+        consumer_conf['enable.auto.commit'] = False
+        self.consumer = consumer_factory(consumer_conf)
+
+        self._running = False
+        self._in_flight = None  # (futures, offsets) del lote en proceso
+        self._processed = 0
+        self._last_report = time.monotonic()
+
+    # --- Rebalanceos ---
+
+    def _on_assign(self, consumer, partitions):
+        logging.info(f"Particiones asignadas: {[(p.topic, p.partition) for p in partitions]}")
+
+    def _on_revoke(self, consumer, partitions):
+        # Antes de perder las particiones terminamos y confirmamos el trabajo en curso,
+        # así el nuevo dueño no reprocesa mensajes ya procesados.
+        logging.info(f"Particiones revocadas: {[(p.topic, p.partition) for p in partitions]}. Drenando trabajo en curso...")
+        self._drain(asynchronous=False)
+
+    def _on_lost(self, consumer, partitions):
+        # Las particiones ya son de otro miembro: no se puede confirmar, solo esperar.
+        logging.warning(f"Particiones perdidas: {[(p.topic, p.partition) for p in partitions]}")
+        if self._in_flight:
+            wait(self._in_flight[0])
+        self._in_flight = None
+
+    # --- Procesamiento ---
+
+    def _dispatch(self, records):
+        """Reparte el lote por carriles y lo envía al pool."""
+        groups = defaultdict(list)
+        offsets = {}
+        for record in records:
+            groups[(record.topic, record.partition, _lane(record, self.lanes))].append(record)
+            offsets[(record.topic, record.partition)] = record.offset + 1
+        futures = [self.executor.submit(_run_lane, self.handler, group) for group in groups.values()]
+        self._in_flight = (futures, offsets)
+
+    def _drain(self, asynchronous=True):
+        """Espera al lote en curso y confirma sus offsets. Propaga el error de un handler."""
+        if self._in_flight is None:
+            return
+        futures, offsets = self._in_flight
+        self._in_flight = None
+        wait(futures)
+        for future in futures:
+            # Si un carril falló no confirmamos el lote: se reentregará tras reiniciar.
+            future.result()
+        commit = [TopicPartition(topic, partition, offset) for (topic, partition), offset in offsets.items()]
+        try:
+            self.consumer.commit(offsets=commit, asynchronous=asynchronous)
+        except KafkaException as e:
+            logging.warning(f"No se pudieron confirmar offsets: {e}")
+        self._processed += sum(f.result() for f in futures)
+        self._report()
+
+    def _report(self):
+        now = time.monotonic()
+        elapsed = now - self._last_report
+        if elapsed >= 30:
+            logging.info(f"Procesados {self._processed} mensajes en {elapsed:.0f}s ({self._processed / elapsed:.0f} msg/s)")
+            self._processed = 0
+            self._last_report = now
+
+    def run(self):
+        """Bucle principal. Termina con stop() o KeyboardInterrupt."""
+        self.consumer.subscribe(self.topics, on_assign=self._on_assign, on_revoke=self._on_revoke, on_lost=self._on_lost)
+        logging.info(f"Worker suscrito a {self.topics} con {self.max_workers} workers y lotes de {self.batch_size}")
+        self._running = True
+        try:
+            while self._running:
+                messages = self.consumer.consume(num_messages=self.batch_size, timeout=self.poll_timeout)
+                records = []
+                for msg in messages:
+                    if msg.error():
+                        if msg.error().code() != KafkaError._PARTITION_EOF:
+                            logging.error(f"Error de consumidor: {msg.error()}")
+                        continue
+                    records.append(_to_record(msg))
+                self._drain()
+                if records:
+                    self._dispatch(records)
+                    logging.debug(f"Lote de {len(records)} mensajes despachado")
+            self._drain(asynchronous=False)
+        except KeyboardInterrupt:
+            logging.info("Interrupción por usuario. Deteniendo worker.")
+            self._drain(asynchronous=False)
+        finally:
+            self.consumer.close()
+            self.executor.shutdown(wait=True)
+            logging.info("Worker cerrado.")
+
+    def stop(self):
+        """Pide al bucle principal que termine tras el lote actual."""
+        self._running = False
+
+
+if __name__ == "__main__":
+    # Ejemplo: worker que solo cuenta mensajes. Ver consumer_example.py para un handler real.
+    def count_handler(records):
+        logging.debug(f"{len(records)} mensajes de {records[0].topic}[{records[0].partition}]")
+
+    env = sys.argv[1] if len(sys.argv) > 1 else os.getenv("KAFKA_ENV", "development")
+    BatchWorker(
+        os.getenv("KAFKA_CONSUMER_GROUP", "my-ingestor-group"),
+        os.getenv("KAFKA_TOPICS_TO_SUBSCRIBE", "raw_events,raw_weather,raw_places").split(','),
+        count_handler,
+        kafka_manager=KafkaManager(env=env),
+    ).run()
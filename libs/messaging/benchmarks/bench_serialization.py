@@ -0,0 +1,95 @@
+"""
+Benchmark de codecs sobre documentos de eventos realistas.
+
+Reporta, por codec: bytes por mensaje (sin comprimir y comprimidos por lotes de
+1000 con lz4/zstd, como hace el productor) y throughput de encode/decode.
+
+    poetry run python benchmarks/bench_serialization.py [num_mensajes]
+"""
+import random
+import sys
+import time
+
+from loopcity_messaging.serialization import EVENT_SCHEMA, Serializer, deserialize
+
+try:  # solo para estimar el tamaño comprimido; no son dependencias de runtime
+    import lz4.frame
+    import zstandard
+except ImportError:
+    lz4 = zstandard = None
+
+CATEGORIES = ["music", "sports", "arts", "family", "film", "food"]
+VENUES = [("WiZink Center", 40.4239, -3.6717), ("Teatro Real", 40.4184, -3.7109), ("La Riviera", 40.4132, -3.7219)]
+
+
+def raw_ticketmaster_event(i):
+    venue, lat, lon = random.choice(VENUES)
+    return {
+        "metadata": {"source_api": "ticketmaster", "query_type": "events_by_city",
+                     "timestamp": "2026-10-18T10:00:00+00:00", "entity_id": f"TM{i:08d}",
+                     "content_hash": f"{random.getrandbits(128):032x}"},
+        "data": {
+            "id": f"TM{i:08d}", "name": f"Concierto {i} - Gira 2026", "type": "event", "locale": "es-es",
+            "url": f"https://www.ticketmaster.es/event/TM{i:08d}",
+            "images": [{"ratio": "16_9", "url": f"https://s1.ticketm.net/dam/a/{i}/img_{w}.jpg", "width": w, "height": w * 9 // 16}
+                       for w in (640, 1024, 2048)],
+            "dates": {"start": {"localDate": "2026-11-01", "localTime": "20:00:00", "dateTime": "2026-11-01T19:00:00Z"},
+                      "timezone": "Europe/Madrid", "status": {"code": "onsale"}},
+            "classifications": [{"primary": True, "segment": {"id": "KZFzniwnSyZfZ7v7nJ", "name": random.choice(CATEGORIES)},
+                                 "genre": {"id": "KnvZfZ7vAev", "name": "Pop"}}],
+            "priceRanges": [{"type": "standard", "currency": "EUR", "min": 25.5, "max": 80.0}],
+            "_embedded": {"venues": [{"name": venue, "city": {"name": "Madrid"}, "country": {"countryCode": "ES"},
+                                      "location": {"latitude": str(lat), "longitude": str(lon)}}]},
+        },
+    }
+
+
+def canonical_event(i):
+    venue, lat, lon = random.choice(VENUES)
+    return {
+        "source_api": "ticketmaster", "id": f"TM{i:08d}", "name": f"Concierto {i} - Gira 2026",
+        "description": "Gira de presentación del nuevo disco", "category": random.choice(CATEGORIES),
+        "city": "Madrid", "venue": venue, "lat": lat, "lon": lon, "start": "2026-11-01T20:00:00", "end": None,
+        "price_min": 25.5, "price_max": 80.0, "currency": "EUR", "url": f"https://www.ticketmaster.es/event/TM{i:08d}",
+        "timestamp": "2026-10-18T10:00:00+00:00",
+    }
+
+
+def compressed_per_message(values, batch=1000):
+    sizes = {}
+    if zstandard is None:
+        return sizes
+    chunks = [b"".join(values[i:i + batch]) for i in range(0, len(values), batch)]
+    sizes["lz4"] = sum(len(lz4.frame.compress(c)) for c in chunks) / len(values)
+    sizes["zstd"] = sum(len(zstandard.ZstdCompressor(level=3).compress(c)) for c in chunks) / len(values)
+    return sizes
+
+
+def bench(label, serializer, docs):
+    start = time.perf_counter()
+    encoded = [serializer.serialize(doc) for doc in docs]
+    encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for value, headers in encoded:
+        deserialize(value, headers)
+    decode_s = time.perf_counter() - start
+    values = [value for value, _ in encoded]
+    compressed = compressed_per_message(values)
+    extra = "  ".join(f"{name}={size:7.1f}B" for name, size in compressed.items())
+    print(f"{label:<22} {sum(map(len, values)) / len(values):8.1f}B  {extra}  "
+          f"encode={len(docs) / encode_s:>10,.0f} msg/s  decode={len(docs) / decode_s:>10,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    random.seed(42)
+    raw = [raw_ticketmaster_event(i) for i in range(n)]
+    canonical = [canonical_event(i) for i in range(n)]
+    print(f"{n} mensajes por caso\n")
+    print("Payload crudo de Ticketmaster (sobre metadata/data):")
+    for codec in ("json", "msgpack"):
+        bench(f"  {codec}", Serializer(codec), raw)
+    print("\nEvento canónico:")
+    for codec in ("json", "msgpack"):
+        bench(f"  {codec}", Serializer(codec), canonical)
+    bench("  avro (event.v1)", Serializer("avro", EVENT_SCHEMA["name"]), canonical)
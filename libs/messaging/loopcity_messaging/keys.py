@@ -0,0 +1,190 @@
+import unicodedata
+import zlib
+from typing import Any, Iterable, Optional, Tuple, Union
+
+# Campos con el identificador de la entidad según la fuente (Ticketmaster usa `id`,
+# Eventbrite `event_id`, TripAdvisor `location_id`...)
+ID_FIELDS = ("id", "event_id", "location_id", "query_city")
+
+# Rutas (dentro del item) donde cada fuente publica la ciudad y las coordenadas.
+# Ticketmaster: _embedded.venues[0]; Eventbrite / Meetup: venue; TripAdvisor: address_obj
+# y latitude/longitude en la raíz; OpenWeather: query_city y coord.
+CITY_PATHS = (
+    ("query_city",),
+    ("city",),
+    ("_embedded", "venues", 0, "city", "name"),
+    ("venue", "address", "city"),
+    ("venue", "city"),
+    ("address_obj", "city"),
+)
+COORD_PATHS = (
+    (("lat",), ("lon",)),
+    (("latitude",), ("longitude",)),
+    (("coord", "lat"), ("coord", "lon")),
+    (("_embedded", "venues", 0, "location", "latitude"), ("_embedded", "venues", 0, "location", "longitude")),
+    (("venue", "latitude"), ("venue", "longitude")),
+    (("venue", "lat"), ("venue", "lng")),
+)
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _get_path(item: Any, path: Tuple) -> Any:
+    for step in path:
+        try:
+            item = item[step]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return item
+
+
+def _first(item: dict, paths: Iterable[Tuple]) -> Any:
+    for path in paths:
+        value = _get_path(item, path)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def entity_id(item: dict, key: Optional[str] = None) -> Optional[str]:
+    """Identificador estable de la entidad: la clave indicada o el primer campo de id presente."""
+    if key is not None:
+        return key
+    for field in ID_FIELDS:
+        if item.get(field) is not None:
+            return str(item[field])
+    return None
+
+
+def normalize_city(name: str) -> str:
+    """Nombre de ciudad comparable entre fuentes: sin acentos, minúsculas y sin espacios extremos."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+def geohash(lat: float, lon: float, precision: int = 5) -> str:
+    """Celda geohash de ``precision`` caracteres (5 ≈ 4,9 x 4,9 km; 6 ≈ 1,2 x 0,6 km)."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    cell, bits, char, even = [], 0, 0, True
+    while len(cell) < precision:
+        interval, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (interval[0] + interval[1]) / 2
+        char <<= 1
+        if value >= mid:
+            char |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            cell.append(_GEOHASH_ALPHABET[char])
+            bits, char = 0, 0
+    return "".join(cell)
+
+
+def extract_city(item: dict) -> Optional[str]:
+    """Ciudad normalizada del item, si la fuente la incluye."""
+    city = _first(item, CITY_PATHS)
+    return normalize_city(city) if isinstance(city, str) else None
+
+
+def extract_coordinates(item: dict) -> Optional[Tuple[float, float]]:
+    """``(lat, lon)`` del item, si la fuente las incluye."""
+    for lat_path, lon_path in COORD_PATHS:
+        lat, lon = _get_path(item, lat_path), _get_path(item, lon_path)
+        if lat in (None, "") or lon in (None, ""):
+            continue
+        try:
+            return float(lat), float(lon)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+class EntityKeyStrategy:
+    """``source:entity_id``: reparto uniforme y orden garantizado por entidad."""
+
+    name = "entity"
+
+    def __call__(self, source_api: str, item: dict, entity_id: Optional[str]) -> Optional[str]:
+        return f"{source_api}:{entity_id}" if entity_id is not None else None
+
+
+class CityKeyStrategy:
+    """Clave por ciudad: todo lo de una ciudad cae en la misma partición (agregaciones locales).
+
+    Con ``buckets > 1`` cada ciudad se reparte en ese número de sub-claves según la
+    entidad (``madrid#3``): evita que una ciudad grande sea una partición caliente,
+    manteniendo cada entidad siempre en la misma partición.
+    """
+
+    name = "city"
+
+    def __init__(self, buckets: int = 1) -> None:
+        self.buckets = max(1, int(buckets))
+        self._fallback = EntityKeyStrategy()
+
+    def __call__(self, source_api: str, item: dict, entity_id: Optional[str]) -> Optional[str]:
+        city = extract_city(item)
+        if city is None:
+            return self._fallback(source_api, item, entity_id)
+        if self.buckets > 1 and entity_id is not None:
+            return f"{city}#{zlib.crc32(entity_id.encode('utf-8')) % self.buckets}"
+        return city
+
+
+class GeohashKeyStrategy:
+    """Clave por celda geohash: eventos cercanos (mismo barrio / recinto) juntos.
+
+    Una ciudad ocupa muchas celdas, así que la carga se reparte sola entre
+    particiones. Sin coordenadas se usa la ciudad y, si tampoco la hay, la entidad.
+    """
+
+    name = "geohash"
+
+    def __init__(self, precision: int = 5) -> None:
+        self.precision = int(precision)
+        self._fallback = CityKeyStrategy()
+
+    def __call__(self, source_api: str, item: dict, entity_id: Optional[str]) -> Optional[str]:
+        coordinates = extract_coordinates(item)
+        if coordinates is None:
+            return self._fallback(source_api, item, entity_id)
+        return f"gh:{geohash(*coordinates, precision=self.precision)}"
+
+
+KeyStrategy = Union[EntityKeyStrategy, CityKeyStrategy, GeohashKeyStrategy]
+
+_STRATEGIES = {
+    EntityKeyStrategy.name: EntityKeyStrategy,
+    CityKeyStrategy.name: CityKeyStrategy,
+    GeohashKeyStrategy.name: GeohashKeyStrategy,
+}
+
+
+def get_key_strategy(spec: Union[str, dict, None] = None) -> KeyStrategy:
+    """Construye una estrategia de clave.
+
+    ``spec`` puede ser un dict de ``topics.yaml`` (``{"strategy": "geohash", "precision": 5}``)
+    o una cadena ``nombre[:parámetro]`` como en ``KAFKA_KEY_STRATEGY`` (``geohash:6``,
+    ``city:4``, ``entity``). Sin ``spec`` se usa ``entity``.
+    """
+    if not spec:
+        return EntityKeyStrategy()
+    if isinstance(spec, str):
+        name, _, param = spec.partition(":")
+        options = {}
+        if param:
+            options = {"precision": int(param)} if name == "geohash" else {"buckets": int(param)}
+    else:
+        options = dict(spec)
+        name = options.pop("strategy", "entity")
+    if name not in _STRATEGIES:
+        raise ValueError(f"Estrategia de clave desconocida: {name}")
+    return _STRATEGIES[name](**options)
+
+
+def partition_for(key: bytes, num_partitions: int) -> int:
+    """Partición que asigna el particionador por defecto de librdkafka (``consistent_random``: crc32)."""
+    return zlib.crc32(key) % num_partitions
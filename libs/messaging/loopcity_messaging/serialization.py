@@ -0,0 +1,136 @@
+import io
+from typing import Any, Dict, List, Optional, Tuple
+
+import fastavro
+import msgpack
+import orjson
+
+# Cabeceras con las que viaja el formato del payload, para que el consumidor lo detecte solo
+CODEC_HEADER = "content-type"
+SCHEMA_HEADER = "schema"
+
+Headers = List[Tuple[str, bytes]]
+
+
+class JsonCodec:
+    """JSON con orjson (varias veces más rápido que json.dumps y sin .encode() extra)."""
+
+    name = "json"
+
+    def encode(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str)
+
+    def decode(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec:
+    """MessagePack: binario sin esquema, más compacto que JSON y rápido de decodificar."""
+
+    name = "msgpack"
+
+    def encode(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, use_bin_type=True, default=str)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+class AvroCodec:
+    """Avro sin contenedor (schemaless): el esquema no viaja en el mensaje, solo su nombre.
+
+    Es el formato más compacto para documentos con forma conocida (p. ej. eventos
+    normalizados); los payloads crudos de las APIs, de forma libre, usan JSON o MessagePack.
+    """
+
+    name = "avro"
+
+    def __init__(self, schema: dict) -> None:
+        self.schema = fastavro.parse_schema(schema)
+        self.schema_name = schema["name"]
+
+    def encode(self, obj: Any) -> bytes:
+        buffer = io.BytesIO()
+        fastavro.schemaless_writer(buffer, self.schema, obj)
+        return buffer.getvalue()
+
+    def decode(self, data: bytes) -> Any:
+        return fastavro.schemaless_reader(io.BytesIO(data), self.schema)
+
+
+_CODECS = {"json": JsonCodec(), "msgpack": MsgpackCodec()}
+_SCHEMAS: Dict[str, AvroCodec] = {}
+
+
+def register_schema(schema: dict) -> AvroCodec:
+    """Registra un esquema Avro (por su ``name``) para producir y consumir con él."""
+    codec = AvroCodec(schema)
+    _SCHEMAS[codec.schema_name] = codec
+    return codec
+
+
+def get_codec(name: str = "json", schema: Optional[str] = None):
+    """Devuelve el codec ``json``, ``msgpack`` o ``avro`` (este último con un esquema registrado)."""
+    if name == "avro":
+        if schema not in _SCHEMAS:
+            raise ValueError(f"Esquema Avro no registrado: {schema}")
+        return _SCHEMAS[schema]
+    if name not in _CODECS:
+        raise ValueError(f"Codec desconocido: {name}")
+    return _CODECS[name]
+
+
+class Serializer:
+    """Serializa payloads con un codec fijo y genera las cabeceras que lo identifican."""
+
+    def __init__(self, codec: str = "json", schema: Optional[str] = None) -> None:
+        self.codec = get_codec(codec, schema)
+        self.headers: Headers = [(CODEC_HEADER, self.codec.name.encode())]
+        if self.codec.name == "avro":
+            self.headers.append((SCHEMA_HEADER, self.codec.schema_name.encode()))
+
+    def serialize(self, obj: Any) -> Tuple[bytes, Headers]:
+        """Devuelve ``(value, headers)`` listos para ``Producer.produce``."""
+        return self.codec.encode(obj), list(self.headers)
+
+
+def _header(headers: Optional[Headers], name: str) -> Optional[str]:
+    for key, value in headers or ():
+        if key == name:
+            return value.decode() if isinstance(value, bytes) else value
+    return None
+
+
+def deserialize(value: bytes, headers: Optional[Headers] = None) -> Any:
+    """Decodifica un payload según sus cabeceras. Sin cabecera se asume JSON (mensajes antiguos)."""
+    if value is None:
+        return None
+    codec = get_codec(_header(headers, CODEC_HEADER) or "json", _header(headers, SCHEMA_HEADER))
+    return codec.decode(value)
+
+
+# Esquema del evento canónico (mismo significado sea cual sea la fuente)
+EVENT_SCHEMA = {
+    "type": "record",
+    "name": "event.v1",
+    "fields": [
+        {"name": "source_api", "type": "string"},
+        {"name": "id", "type": "string"},
+        {"name": "name", "type": ["null", "string"], "default": None},
+        {"name": "description", "type": ["null", "string"], "default": None},
+        {"name": "category", "type": ["null", "string"], "default": None},
+        {"name": "city", "type": ["null", "string"], "default": None},
+        {"name": "venue", "type": ["null", "string"], "default": None},
+        {"name": "lat", "type": ["null", "double"], "default": None},
+        {"name": "lon", "type": ["null", "double"], "default": None},
+        {"name": "start", "type": ["null", "string"], "default": None},
+        {"name": "end", "type": ["null", "string"], "default": None},
+        {"name": "price_min", "type": ["null", "double"], "default": None},
+        {"name": "price_max", "type": ["null", "double"], "default": None},
+        {"name": "currency", "type": ["null", "string"], "default": None},
+        {"name": "url", "type": ["null", "string"], "default": None},
+        {"name": "timestamp", "type": "string"},
+    ],
+}
+
+register_schema(EVENT_SCHEMA)
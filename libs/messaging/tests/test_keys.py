@@ -0,0 +1,56 @@
+from collections import Counter
+
+import pytest
+
+from loopcity_messaging.keys import (
+    CityKeyStrategy,
+    GeohashKeyStrategy,
+    extract_city,
+    geohash,
+    get_key_strategy,
+    partition_for,
+)
+
+TICKETMASTER_EVENT = {
+    "id": "TM001",
+    "_embedded": {"venues": [{"city": {"name": "Málaga"}, "location": {"latitude": "36.7213", "longitude": "-4.4214"}}]},
+}
+
+
+def test_geohash_matches_reference_cells():
+    assert geohash(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+    assert geohash(40.4168, -3.7038, precision=5) == "ezjmg"
+
+
+def test_city_is_extracted_per_source_and_normalized():
+    assert extract_city(TICKETMASTER_EVENT) == "malaga"
+    assert extract_city({"venue": {"address": {"city": " MADRID "}}}) == "madrid"
+    assert extract_city({"query_city": "Sevilla"}) == "sevilla"
+    assert extract_city({"name": "sin ciudad"}) is None
+
+
+def test_strategies_fall_back_to_coarser_keys():
+    strategy = GeohashKeyStrategy(precision=5)
+    assert strategy("ticketmaster", TICKETMASTER_EVENT, "TM001") == f"gh:{geohash(36.7213, -4.4214, 5)}"
+    assert strategy("eventbrite", {"venue": {"city": "Madrid"}}, "EB1") == "madrid"
+    assert strategy("eventbrite", {"title": "x"}, "EB1") == "eventbrite:EB1"
+    assert strategy("eventbrite", {"title": "x"}, None) is None
+
+
+def test_city_buckets_spread_a_hot_city_but_keep_each_entity_together():
+    strategy = CityKeyStrategy(buckets=4)
+    keys = {strategy("ticketmaster", {"city": "Madrid"}, f"TM{i}") for i in range(100)}
+    assert keys == {"madrid#0", "madrid#1", "madrid#2", "madrid#3"}
+    assert strategy("ticketmaster", {"city": "Madrid"}, "TM7") == strategy("ticketmaster", {"city": "Madrid"}, "TM7")
+
+    partitions = Counter(partition_for(key.encode(), 6) for key in keys)
+    assert len(partitions) > 1
+
+
+def test_get_key_strategy_from_config_and_env_specs():
+    assert get_key_strategy().name == "entity"
+    assert get_key_strategy({"strategy": "geohash", "precision": 6}).precision == 6
+    assert get_key_strategy("city:8").buckets == 8
+    assert get_key_strategy("geohash:4").precision == 4
+    with pytest.raises(ValueError):
+        get_key_strategy("random")
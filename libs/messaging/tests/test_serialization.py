@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from loopcity_messaging.serialization import EVENT_SCHEMA, Serializer, deserialize, get_codec
+
+RAW_EVENT = {
+    "metadata": {"source_api": "ticketmaster", "query_type": "events_by_city", "timestamp": "2026-10-18T10:00:00+00:00"},
+    "data": {"id": "TM001", "name": "Concierto A", "dates": {"start": {"localDate": "2026-11-01"}}, "priceRanges": [{"min": 25.5}]},
+}
+
+CANONICAL_EVENT = {
+    "source_api": "ticketmaster",
+    "id": "TM001",
+    "name": "Concierto A",
+    "description": None,
+    "category": "music",
+    "city": "Madrid",
+    "venue": "WiZink Center",
+    "lat": 40.4239,
+    "lon": -3.6717,
+    "start": "2026-11-01T20:00:00",
+    "end": None,
+    "price_min": 25.5,
+    "price_max": 80.0,
+    "currency": "EUR",
+    "url": "https://www.ticketmaster.es/event/TM001",
+    "timestamp": "2026-10-18T10:00:00+00:00",
+}
+
+
+@pytest.mark.parametrize("codec", ["json", "msgpack"])
+def test_schemaless_codecs_round_trip(codec):
+    value, headers = Serializer(codec).serialize(RAW_EVENT)
+    assert headers == [("content-type", codec.encode())]
+    assert deserialize(value, headers) == RAW_EVENT
+
+
+def test_avro_round_trip_and_headers():
+    value, headers = Serializer("avro", EVENT_SCHEMA["name"]).serialize(CANONICAL_EVENT)
+    assert dict(headers) == {"content-type": b"avro", "schema": b"event.v1"}
+    assert deserialize(value, headers) == CANONICAL_EVENT
+    assert len(value) < len(Serializer("msgpack").serialize(CANONICAL_EVENT)[0])
+
+
+def test_messages_without_header_are_read_as_json():
+    assert deserialize(json.dumps(RAW_EVENT).encode("utf-8")) == RAW_EVENT
+    assert deserialize(None) is None
+
+
+def test_unknown_codec_or_schema_fails_loudly():
+    with pytest.raises(ValueError):
+        get_codec("protobuf")
+    with pytest.raises(ValueError):
+        deserialize(b"\x00", [("content-type", b"avro"), ("schema", b"missing.v1")])